@@ -1,38 +1,270 @@
+import bisect
+import math
+import random
 import unittest
+from unittest import mock
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
 
 
 def binary_search(indexable, key, comparator, start = 0, end = None):
 	if end is None:
 		end = len(indexable)
-	boundary = end - start
-	if boundary == 0:
-		return -1, None
-	middle_index = start + (boundary // 2)
-	comparison = comparator(indexable[middle_index], key)
-	if comparison == 0:
-		return middle_index, indexable[middle_index]
-	if comparison > 0:
-		return binary_search(indexable, key, comparator, middle_index, end)
-	else:
-		return binary_search(indexable, key, comparator, 0, middle_index)
+	while start < end:
+		middle_index = start + (end - start) // 2
+		comparison = comparator(indexable[middle_index], key)
+		if comparison == 0:
+			return middle_index, indexable[middle_index]
+		if comparison > 0:
+			start = middle_index + 1
+		else:
+			end = middle_index
+	return -1, None
 
 
 def first_occur_binary_search(indexable, key, comparator, start = 0, end = None):
 	if end is None:
 		end = len(indexable)
-	boundary = end - start
-	if boundary == 0:
+	found = -1
+	while start < end:
+		middle_index = start + (end - start) // 2
+		comparison = comparator(indexable[middle_index], key)
+		if comparison > 0:
+			start = middle_index + 1
+		else:
+			# a match may still have an earlier equal element, keep it and continue to the left
+			if comparison == 0:
+				found = middle_index
+			end = middle_index
+	if found == -1:
 		return -1, None
-	middle_index = start + (boundary // 2)
-	comparison = comparator(indexable[middle_index], key)
-	if comparison == 0:
-		any_before = first_occur_binary_search(indexable, key, comparator, 0, middle_index)
-		if any_before[0] == -1:
-			return middle_index, indexable[middle_index]
-	if comparison > 0:
-		return binary_search(indexable, key, comparator, middle_index, end)
-	else:
-		return binary_search(indexable, key, comparator, 0, middle_index)
+	return found, indexable[found]
+
+
+def lower_bound(sequence, value, low = 0, high = None, key = None):
+	if high is None:
+		high = len(sequence)
+	if key is None:
+		return bisect.bisect_left(sequence, value, low, high)
+	while low < high:
+		middle = (low + high) // 2
+		if key(sequence[middle]) < value:
+			low = middle + 1
+		else:
+			high = middle
+	return low
+
+
+def upper_bound(sequence, value, low = 0, high = None, key = None):
+	if high is None:
+		high = len(sequence)
+	if key is None:
+		return bisect.bisect_right(sequence, value, low, high)
+	while low < high:
+		middle = (low + high) // 2
+		if value < key(sequence[middle]):
+			high = middle
+		else:
+			low = middle + 1
+	return low
+
+
+def equal_range(sequence, value, low = 0, high = None, key = None):
+	if high is None:
+		high = len(sequence)
+	while low < high:
+		middle = (low + high) // 2
+		probe = sequence[middle] if key is None else key(sequence[middle])
+		if probe < value:
+			low = middle + 1
+		elif value < probe:
+			high = middle
+		else:
+			# the bounds are on either side of the first match, so the rest of the search is split between them
+			return lower_bound(sequence, value, low, middle, key), upper_bound(sequence, value, middle + 1, high, key)
+	return low, low
+
+
+def gallop_search(sequence, value, hint = 0, low = 0, high = None):
+	if high is None:
+		high = len(sequence)
+	hint = min(max(hint, low), high)
+	# probe at distances 1, 2, 4, ... from the hint until the value is bracketed, then bisect the last gap
+	step = 1
+	if hint < high and sequence[hint] < value:
+		left = hint + 1
+		right = hint + step
+		while right < high and sequence[right] < value:
+			left = right + 1
+			step *= 2
+			right = hint + step
+		return bisect.bisect_left(sequence, value, left, min(right, high))
+	right = hint
+	left = hint - step
+	while left >= low and not sequence[left] < value:
+		right = left
+		step *= 2
+		left = hint - step
+	return bisect.bisect_left(sequence, value, max(left + 1, low), right)
+
+
+def _interpolation_search(sequence, value, low, high):
+	# returns the lower bound and the number of elements read
+	if low == high or not sequence[low] < value:
+		return low, 1
+	high -= 1
+	low_value = sequence[low]
+	high_value = sequence[high]
+	if high_value < value:
+		return high + 1, 2
+	probes = 2
+	# interpolation takes O(log log n) probes on uniform keys but O(n) on skewed ones, so it gets a budget before bisecting
+	budget = 2 * (high - low).bit_length().bit_length()
+	while high - low > 1:
+		probe = (low + high) // 2
+		if budget > 0:
+			budget -= 1
+			try:
+				position = (value - low_value) * (high - low) / (high_value - low_value)
+			except OverflowError:
+				position = math.nan
+			# infinite bounds and ints too large for a float have no position to interpolate, those steps bisect
+			if math.isfinite(position):
+				probe = min(max(low + int(position), low + 1), high - 1)
+		probe_value = sequence[probe]
+		probes += 1
+		if probe_value < value:
+			low = probe
+			low_value = probe_value
+		else:
+			high = probe
+			high_value = probe_value
+	return high, probes
+
+
+def interpolation_search(sequence, value, low = 0, high = None):
+	if high is None:
+		high = len(sequence)
+	return _interpolation_search(sequence, value, low, high)[0]
+
+
+def _is_numeric(sequence):
+	return len(sequence) > 0 and set(map(type, sequence)) <= {int, float}
+
+
+def _is_finite(sequence):
+	# the sequence is sorted, so infinities and the largest ints can only sit at its ends
+	try:
+		return math.isfinite(sequence[0]) and math.isfinite(sequence[-1])
+	except OverflowError:
+		return False
+
+
+class SearchIndex:
+
+	MODES = ("bisect", "interpolation", "gallop")
+
+	def __init__(self, sorted_sequence, mode = "auto", samples = 32):
+		if mode != "auto" and mode not in SearchIndex.MODES:
+			raise ValueError("mode must be 'auto' or one of {}".format(", ".join(SearchIndex.MODES)))
+		self._sequence = sorted_sequence
+		self._cursor = 0
+		if mode == "auto":
+			mode = self._estimate_mode(samples)
+		self.mode = mode
+
+	def _estimate_mode(self, samples):
+		n = len(self._sequence)
+		if n < 2 * samples or not _is_numeric(self._sequence) or not _is_finite(self._sequence):
+			return "bisect"
+		# search for evenly spaced elements and compare the interpolation probes with the log2(n) of a bisection
+		probes = 0
+		for i in range(samples):
+			value = self._sequence[(2 * i + 1) * n // (2 * samples)]
+			probes += _interpolation_search(self._sequence, value, 0, n)[1]
+		if 2 * probes < samples * n.bit_length():
+			return "interpolation"
+		return "bisect"
+
+	def lower_bound(self, value):
+		if self.mode == "interpolation":
+			return interpolation_search(self._sequence, value)
+		if self.mode == "gallop":
+			self._cursor = gallop_search(self._sequence, value, self._cursor)
+			return self._cursor
+		return bisect.bisect_left(self._sequence, value)
+
+	def search(self, value):
+		index = self.lower_bound(value)
+		if index < len(self._sequence) and not value < self._sequence[index]:
+			return index, self._sequence[index]
+		return -1, None
+
+	def __contains__(self, value):
+		return self.search(value)[0] != -1
+
+	def __len__(self):
+		return len(self._sequence)
+
+
+def _numeric_dtype(values):
+	types = set(map(type, values))
+	if types == {int}:
+		return numpy.int64
+	if types == {float}:
+		return numpy.float64
+	return None
+
+
+def _numpy_batch_search(sorted_sequence, keys, side):
+	if isinstance(sorted_sequence, numpy.ndarray):
+		indices = numpy.searchsorted(sorted_sequence, keys, side = side)
+		return indices if isinstance(keys, numpy.ndarray) else indices.tolist()
+	# scanning and copying the whole sequence only pays off when there are enough keys to spread it over
+	if 4 * len(keys) < len(sorted_sequence):
+		return None
+	if isinstance(keys, numpy.ndarray):
+		return numpy.searchsorted(sorted_sequence, keys, side = side)
+	dtype = _numeric_dtype(sorted_sequence)
+	# mixed ints and floats stay in python, float64 would round large ints
+	if dtype is None or _numeric_dtype(keys) is not dtype:
+		return None
+	try:
+		values = numpy.array(sorted_sequence, dtype = dtype)
+		queries = numpy.array(keys, dtype = dtype)
+	except OverflowError:
+		return None
+	return numpy.searchsorted(values, queries, side = side).tolist()
+
+
+def batch_search(sorted_sequence, keys, side = "left"):
+	if side not in ("left", "right"):
+		raise ValueError("side must be 'left' or 'right'")
+	if numpy is not None and len(keys) > 0:
+		indices = _numpy_batch_search(sorted_sequence, keys, side)
+		if indices is not None:
+			return indices
+	n = len(sorted_sequence)
+	if len(keys) < n:
+		# sorting the keys would cost more than it saves the C bisect
+		search = bisect.bisect_left if side == "left" else bisect.bisect_right
+		return [search(sorted_sequence, key) for key in keys]
+	# about as many queries as elements, a linear merge of the sorted keys with the sequence is cheapest
+	indices = [0 for i in range(len(keys))]
+	position = 0
+	for i in sorted(range(len(keys)), key = keys.__getitem__):
+		key = keys[i]
+		if side == "left":
+			while position < n and sorted_sequence[position] < key:
+				position += 1
+		else:
+			while position < n and not key < sorted_sequence[position]:
+				position += 1
+		indices[i] = position
+	return indices
 
 
 class TestBinarySearch(unittest.TestCase):
@@ -54,3 +286,151 @@ class TestBinarySearch(unittest.TestCase):
 		search_list = (1, 3, 5, 6, 7, 8, 9, 9, 9, 9, 9, 9, 9, 10, 44, 100)
 		result = first_occur_binary_search(search_list, 9, TestBinarySearch.numeric_comparator)
 		self.assertEqual((6, 9), result)
+
+	def test_search_every_position(self):
+		search_list = [1, 3, 3, 3, 5, 7, 7, 9]
+		for key in range(11):
+			result = binary_search(search_list, key, TestBinarySearch.numeric_comparator)
+			if key in search_list:
+				self.assertEqual(key, result[1])
+				self.assertEqual(key, search_list[result[0]])
+			else:
+				self.assertEqual((-1, None), result)
+			first = first_occur_binary_search(search_list, key, TestBinarySearch.numeric_comparator)
+			if key in search_list:
+				self.assertEqual((search_list.index(key), key), first)
+			else:
+				self.assertEqual((-1, None), first)
+		self.assertEqual((-1, None), binary_search([], 1, TestBinarySearch.numeric_comparator))
+		self.assertEqual((-1, None), binary_search(search_list, 1, TestBinarySearch.numeric_comparator, 1))
+
+
+class TestBounds(unittest.TestCase):
+
+	def test_bounds(self):
+		random.seed(2)
+		sequence = sorted(random.randint(0, 50) for i in range(300))
+		for value in range(-1, 52):
+			self.assertEqual(bisect.bisect_left(sequence, value), lower_bound(sequence, value))
+			self.assertEqual(bisect.bisect_right(sequence, value), upper_bound(sequence, value))
+			expected = (bisect.bisect_left(sequence, value), bisect.bisect_right(sequence, value))
+			self.assertEqual(expected, equal_range(sequence, value))
+			self.assertEqual(expected[0], lower_bound(sequence, value, key = lambda x: x))
+			self.assertEqual(expected[1], upper_bound(sequence, value, key = lambda x: x))
+			self.assertEqual(expected, equal_range(sequence, value, key = lambda x: x))
+		self.assertEqual((0, 0), equal_range([], 1))
+		self.assertEqual((5, 5), equal_range(sequence, 0, 5, 5))
+
+	def test_key(self):
+		records = [("b", 1), ("a", 2), ("d", 2), ("c", 5), ("e", 8)]
+		second = lambda record: record[1]
+		self.assertEqual(1, lower_bound(records, 2, key = second))
+		self.assertEqual(3, upper_bound(records, 2, key = second))
+		self.assertEqual((1, 3), equal_range(records, 2, key = second))
+		self.assertEqual((3, 3), equal_range(records, 4, key = second))
+		self.assertEqual((2, 3), equal_range(records, 2, 2, 4, key = second))
+
+
+class TestBatchSearch(unittest.TestCase):
+
+	def check(self, sorted_sequence, keys):
+		for side, search in (("left", bisect.bisect_left), ("right", bisect.bisect_right)):
+			expected = [search(sorted_sequence, key) for key in keys]
+			self.assertEqual(expected, list(batch_search(sorted_sequence, keys, side)))
+
+	def test_batch_search(self):
+		random.seed(0)
+		sorted_sequence = sorted(random.randint(0, 1000) for i in range(2000))
+		self.check(sorted_sequence, [random.randint(-10, 1010) for i in range(100)])
+		self.check(sorted_sequence, [random.randint(-10, 1010) for i in range(5000)])
+		self.check(sorted_sequence, [random.random() * 1000 for i in range(500)])
+		self.check(sorted_sequence, [])
+		self.check([], [1, 2, 3])
+		words = sorted("".join(random.choice("abc") for j in range(3)) for i in range(300))
+		self.check(words, ["", "a", "abc", "b", "ca", "ccc", "d"] * 100)
+		self.check(words, ["b", "a", "cab"])
+		with self.assertRaises(ValueError):
+			batch_search(sorted_sequence, [1], "middle")
+
+	def test_without_numpy(self):
+		random.seed(1)
+		sorted_sequence = sorted(random.randint(0, 100) for i in range(1000))
+		with mock.patch(__name__ + ".numpy", None):
+			self.check(sorted_sequence, [random.randint(-1, 101) for i in range(300)])
+			self.check(sorted_sequence, [random.randint(-1, 101) for i in range(3000)])
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_few_keys(self):
+		sorted_sequence = list(range(0, 2000, 2))
+		with mock.patch.object(numpy, "array", side_effect = AssertionError("sequence was copied")):
+			self.check(sorted_sequence, [5, 0, 1998, 1999])
+
+	@unittest.skipIf(numpy is None, "NumPy is not installed")
+	def test_ndarray(self):
+		sorted_sequence = numpy.arange(0, 100, 2)
+		keys = numpy.array([5, 0, 98, 99])
+		self.assertEqual([3, 0, 49, 50], batch_search(sorted_sequence, keys).tolist())
+		self.assertEqual([3, 1, 50, 50], batch_search(sorted_sequence, keys, "right").tolist())
+
+
+class TestSearchModes(unittest.TestCase):
+
+	def test_gallop_search(self):
+		random.seed(4)
+		sequence = sorted(random.randint(0, 100) for i in range(200))
+		for value in range(-1, 102):
+			expected = bisect.bisect_left(sequence, value)
+			for hint in (-5, 0, 1, 50, 100, 199, 200, 300):
+				self.assertEqual(expected, gallop_search(sequence, value, hint))
+		self.assertEqual(0, gallop_search([], 1, 0))
+		self.assertEqual(3, gallop_search(sequence, 1000, 0, 1, 3))
+
+	def test_interpolation_search(self):
+		random.seed(5)
+		for sequence in (sorted(random.randint(0, 10 ** 6) for i in range(1000)),
+		                 sorted(random.random() for i in range(1000)),
+		                 sorted(random.randint(0, 3) for i in range(1000)),
+		                 sorted(2 ** random.randint(0, 60) for i in range(1000)),
+		                 [], [7]):
+			for value in sequence[::13] + [-1, 0, 0.5, 3, 2 ** 61]:
+				self.assertEqual(bisect.bisect_left(sequence, value), interpolation_search(sequence, value))
+		inf = float("inf")
+		for sequence in ([0.0, 1.0, 2.0, inf], [-inf, 0.0, 1.0], [-inf, -1.0, 0.0, 1.0, 2.0, inf], [-inf, inf],
+		                 [0.5, 1, 2.5, 10 ** 400], [-10 ** 400, 0.5, 2, 10 ** 300]):
+			for value in sequence + [-inf, -1.5, 0.5, 1.5, 10 ** 350, inf]:
+				self.assertEqual(bisect.bisect_left(sequence, value), interpolation_search(sequence, value))
+
+	def test_probes(self):
+		random.seed(6)
+		n = 100000
+		sequence = sorted(random.randint(0, 10 ** 9) for i in range(n))
+		probes = 0
+		for i in range(100):
+			probes += _interpolation_search(sequence, random.randint(0, 10 ** 9), 0, n)[1]
+		self.assertTrue(probes < 100 * 10, "Interpolation took {} probes on uniform keys".format(probes / 100))
+		skewed = sorted(2 ** random.randint(0, 60) + i for i in range(n))
+		for value in skewed[::1000]:
+			self.assertTrue(_interpolation_search(skewed, value, 0, n)[1] <= 3 * n.bit_length())
+
+	def test_search_index(self):
+		random.seed(7)
+		uniform = sorted(random.randint(0, 10 ** 6) for i in range(10000))
+		self.assertEqual("interpolation", SearchIndex(uniform).mode)
+		self.assertEqual("bisect", SearchIndex(sorted(2 ** random.randint(0, 60) for i in range(10000))).mode)
+		self.assertEqual("bisect", SearchIndex(sorted(str(x) for x in uniform)).mode)
+		self.assertEqual("bisect", SearchIndex(uniform[:10]).mode)
+		floats = sorted(random.random() for i in range(10000))
+		self.assertEqual("interpolation", SearchIndex(floats).mode)
+		self.assertEqual("bisect", SearchIndex([float("-inf")] + floats).mode)
+		self.assertEqual("bisect", SearchIndex(floats + [float("inf")]).mode)
+		self.assertEqual("bisect", SearchIndex(floats + [10 ** 400]).mode)
+		for mode in ("auto",) + SearchIndex.MODES:
+			index = SearchIndex(uniform, mode)
+			self.assertEqual(len(uniform), len(index))
+			# increasing queries as a moving cursor would see them
+			for value in sorted(uniform[::97] + [-1, 10 ** 7, 500]):
+				expected = first_occur_binary_search(uniform, value, TestBinarySearch.numeric_comparator)
+				self.assertEqual(expected, index.search(value))
+				self.assertEqual(value in uniform, value in index)
+		with self.assertRaises(ValueError):
+			SearchIndex(uniform, "linear")
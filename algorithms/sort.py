@@ -1,8 +1,26 @@
+import bisect
 import functools
+import heapq
+import multiprocessing
+import os
+import pickle
 import random
 import string
-import timeit
+import struct
+import sys
+import tempfile
+import time
 import unittest
+from array import array as typed_array
+from multiprocessing import shared_memory
+from unittest import mock
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+_NUMPY_THRESHOLD = 256
 
 
 def exchange(arr, i, j):
@@ -11,6 +29,45 @@ def exchange(arr, i, j):
 	arr[j] = temp
 
 
+def _numeric_array(array):
+	if numpy is None or len(array) < _NUMPY_THRESHOLD:
+		return None
+	types = set(map(type, array))
+	if types == {int}:
+		dtype = numpy.int64
+	elif types == {float}:
+		dtype = numpy.float64
+	else:
+		return None
+	try:
+		return numpy.array(array, dtype = dtype)
+	except OverflowError:
+		return None
+
+
+def _keyed_sort(sorter):
+	# keys are computed once and paired with their original index, so the sort compares cheap tuples and
+	# ties are broken by position, which also makes every keyed sort stable
+	@functools.wraps(sorter)
+	def keyed_sorter(array, *args, key = None, reverse = False, **kwargs):
+		if key is None and not reverse:
+			return sorter(array, *args, **kwargs)
+		if kwargs.get("in_place"):
+			# the decorated copy alone takes O(n) extra memory, which an in place sort promises not to use
+			raise ValueError("in_place cannot be combined with key or reverse")
+		keys = array if key is None else map(key, array)
+		sign = -1 if reverse else 1
+		decorated = list(zip(keys, range(0, sign * len(array), sign)))
+		sorter(decorated, *args, **kwargs)
+		if reverse:
+			decorated.reverse()
+		values = list(array)
+		array[:] = [values[sign * i] for k, i in decorated]
+
+	return keyed_sorter
+
+
+@_keyed_sort
 def selection_sort(arr):
 	length = len(arr)
 	for i in range(length):
@@ -21,6 +78,7 @@ def selection_sort(arr):
 		exchange(arr, i, current_min)
 
 
+@_keyed_sort
 def insertion_sort(arr):
 	_range_insertion_sort(arr, 0, len(arr))
 
@@ -35,6 +93,126 @@ def _range_insertion_sort(array, low, high):
 		array[insertion_point] = insertion_val
 
 
+def _merge_exchange_network(n):
+	# Batcher's merge exchange (Knuth, Algorithm 5.2.2M), the comparators come out as index pairs
+	comparators = []
+	t = (n - 1).bit_length()
+	p = 1 << (t - 1)
+	while p > 0:
+		q = 1 << (t - 1)
+		r = 0
+		d = p
+		while True:
+			for i in range(n - d):
+				if i & p == r:
+					comparators.append((i, i + d))
+			if q == p:
+				break
+			d = q - p
+			q >>= 1
+			r = p
+		p >>= 1
+	return comparators
+
+
+def _compile_network_sort(n):
+	# unrolled into straight line code so every comparator is a local compare and swap with no loop overhead
+	names = ", ".join("v{}".format(i) for i in range(n))
+	lines = ["def network_{}(array, low):".format(n), "\t{}, = array[low:low + {}]".format(names, n)]
+	for i, j in _merge_exchange_network(n):
+		lines.append("\tif v{1} < v{0}: v{0}, v{1} = v{1}, v{0}".format(i, j))
+	for i in range(n):
+		lines.append("\tarray[low + {0}] = v{0}".format(i))
+	namespace = {}
+	exec("\n".join(lines), namespace)
+	return namespace["network_{}".format(n)]
+
+
+_NETWORK_SORTS = [None, None] + [_compile_network_sort(n) for n in range(2, 17)]
+
+
+def _small_sort(array, low, high):
+	# sorting networks are not stable, the merge sorts keep using insertion sort for their small runs
+	n = high - low
+	if n >= len(_NETWORK_SORTS):
+		_range_insertion_sort(array, low, high)
+	elif n > 1:
+		_NETWORK_SORTS[n](array, low)
+
+
+@_keyed_sort
+def network_sort(array):
+	if len(array) < len(_NETWORK_SORTS):
+		_small_sort(array, 0, len(array))
+	else:
+		pdq_sort(array)
+
+
+CUTOFFS = {
+	"merge_sort": 16,
+	"quick_sort": 16,
+	"iterative_quick_sort": 15,
+	"sampling_quick_sort": 16,
+	"threeway_quick_sort": 16,
+	"intro_sort": 16,
+	"pdq_sort": 16,
+	"natural_merge_sort": 16,
+	"msd_string_sort": 16,
+	"quick3_string_sort": 17,
+	"msd_bytes_sort": 17,
+}
+
+AUTO_TUNE = os.environ.get("DATASTRUCTURES_AUTOTUNE") == "1"
+_tuned = False
+
+
+def _cutoff(name, cutoff):
+	global _tuned
+	if cutoff is not None:
+		if cutoff < 4:
+			raise ValueError("cutoff must be at least 4")
+		return cutoff
+	if AUTO_TUNE and not _tuned:
+		_tuned = True
+		tune_cutoffs()
+	return CUTOFFS[name]
+
+
+def _tuning_input(name, rng, size):
+	if name in ("msd_string_sort", "quick3_string_sort"):
+		return ["".join(rng.choice(string.ascii_lowercase) for j in range(rng.randint(1, 12))) for i in range(size)]
+	if name == "msd_bytes_sort":
+		return [bytes(rng.randrange(256) for j in range(rng.randint(1, 12))) for i in range(size)]
+	return [rng.random() for i in range(size)]
+
+
+def _tuning_sorter(name):
+	if name == "msd_string_sort":
+		return functools.partial(msd_string_sort, charset = string.ascii_lowercase)
+	return globals()[name]
+
+
+def tune_cutoffs(names = None, candidates = (4, 8, 12, 16, 24, 32), size = 2000, repetitions = 3, seed = 0):
+	if names is None:
+		names = list(CUTOFFS)
+	for name in names:
+		data = _tuning_input(name, random.Random(seed), size)
+		sorter = _tuning_sorter(name)
+		best = None
+		for cutoff in candidates:
+			elapsed = float("inf")
+			for i in range(repetitions):
+				to_sort = list(data)
+				start = time.perf_counter()
+				sorter(to_sort, cutoff = cutoff)
+				elapsed = min(elapsed, time.perf_counter() - start)
+			if best is None or elapsed < best[0]:
+				best = (elapsed, cutoff)
+		CUTOFFS[name] = best[1]
+	return dict(CUTOFFS)
+
+
+@_keyed_sort
 def shell_sort(arr):
 	length = len(arr)
 	h = 1
@@ -77,10 +255,103 @@ def _merge(input_array, aux, low, mid, high):
 			a_pos += 1
 
 
-# TODO: implement k-way and linked list merge sort
-def merge_sort(input_array):
+def _reverse(array, low, high):
+	high -= 1
+	while low < high:
+		exchange(array, low, high)
+		low += 1
+		high -= 1
+
+
+def _rotate(array, low, mid, high):
+	_reverse(array, low, mid)
+	_reverse(array, mid, high)
+	_reverse(array, low, high)
+
+
+def _in_place_merge(array, low, mid, high):
+	# SymMerge by Kim and Kutzner, stable and using rotations instead of an aux array
+	if mid - low == 1:
+		value = array[low]
+		i = mid
+		j = high
+		while i < j:
+			h = (i + j) // 2
+			if array[h] < value:
+				i = h + 1
+			else:
+				j = h
+		for k in range(low, i - 1):
+			array[k] = array[k + 1]
+		array[i - 1] = value
+		return
+	if high - mid == 1:
+		value = array[mid]
+		i = low
+		j = mid
+		while i < j:
+			h = (i + j) // 2
+			if not value < array[h]:
+				i = h + 1
+			else:
+				j = h
+		for k in range(mid, i, -1):
+			array[k] = array[k - 1]
+		array[i] = value
+		return
+	half = (low + high) // 2
+	n = half + mid
+	if mid > half:
+		start = n - high
+		r = half
+	else:
+		start = low
+		r = mid
+	p = n - 1
+	while start < r:
+		c = (start + r) // 2
+		if not array[p - c] < array[c]:
+			start = c + 1
+		else:
+			r = c
+	end = n - start
+	if start < mid < end:
+		_rotate(array, start, mid, end)
+	if low < start < half:
+		_in_place_merge(array, low, start, half)
+	if half < end < high:
+		_in_place_merge(array, half, end, high)
+
+
+def _in_place_merge_sort(array, segment_size):
+	length = len(array)
+	for start in range(0, length, segment_size):
+		_range_insertion_sort(array, start, min(start + segment_size, length))
+	while segment_size < length:
+		start = 0
+		while start + segment_size < length:
+			mid = start + segment_size
+			end = min(mid + segment_size, length)
+			if array[mid] < array[mid - 1]:
+				_in_place_merge(array, start, mid, end)
+			start = end
+		segment_size = segment_size * 2
+
+
+# TODO: implement linked list merge sort
+@_keyed_sort
+def merge_sort(input_array, in_place = False, cutoff = None):
+	segment_size = _cutoff("merge_sort", cutoff)
+	if in_place:
+		_in_place_merge_sort(input_array, segment_size)
+		return
+	# an explicit cutoff asks for the python merge, so it is not bypassed by numpy
+	values = _numeric_array(input_array) if cutoff is None else None
+	if values is not None:
+		values.sort(kind = "mergesort")
+		input_array[:] = values.tolist()
+		return
 	original = input_array
-	segment_size = 16
 	length = len(input_array)
 
 	# use insertion sort for small sub-array
@@ -110,10 +381,127 @@ def merge_sort(input_array):
 			original[i] = input_array[i]
 
 
+def _merge_sorted_chunk(chunk):
+	merge_sort(chunk)
+	return chunk
+
+
+@_keyed_sort
+def parallel_merge_sort(array, workers = None, threshold = 100000):
+	length = len(array)
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	if workers < 2 or length < 2 or length < threshold:
+		merge_sort(array)
+		return
+	chunk_size = -(-length // workers)
+	chunks = [array[i:i + chunk_size] for i in range(0, length, chunk_size)]
+	with multiprocessing.Pool(min(workers, len(chunks))) as pool:
+		chunks = pool.map(_merge_sorted_chunk, chunks)
+	array[:] = heapq.merge(*chunks)
+
+
+def merge_sorted(*iterables, key = None, reverse = False, unique = False):
+	merged = heapq.merge(*iterables, key = key, reverse = reverse)
+	if not unique:
+		yield from merged
+		return
+	has_last = False
+	last = None
+	for value in merged:
+		value_key = value if key is None else key(value)
+		if not has_last or value_key != last:
+			yield value
+			last = value_key
+			has_last = True
+
+
+def _read_chunk(iterator, memory_limit):
+	chunk = []
+	used = 0
+	for item in iterator:
+		chunk.append(item)
+		used += sys.getsizeof(item) + 8
+		if used >= memory_limit:
+			return chunk, used, False
+	return chunk, used, True
+
+
+def _spill_run(items, temp_dir, block_size):
+	# runs go to named files that are closed between passes, so only the runs being merged hold a descriptor
+	fd, path = tempfile.mkstemp(dir = temp_dir)
+	with os.fdopen(fd, "wb") as spill:
+		block = []
+		for item in items:
+			block.append(item)
+			if len(block) == block_size:
+				pickle.dump(block, spill, pickle.HIGHEST_PROTOCOL)
+				block = []
+		if block:
+			pickle.dump(block, spill, pickle.HIGHEST_PROTOCOL)
+	return path
+
+
+def _read_run(path):
+	with open(path, "rb") as spill:
+		while True:
+			try:
+				block = pickle.load(spill)
+			except EOFError:
+				return
+			yield from block
+
+
+def external_sort(source, memory_limit = 64 * 1024 * 1024, key = None, reverse = False, temp_dir = None, fan_in = 64):
+	if fan_in < 2:
+		raise ValueError("fan_in must be at least 2")
+	if isinstance(source, (str, bytes, os.PathLike)):
+		with open(source) as f:
+			yield from external_sort(f, memory_limit, key, reverse, temp_dir, fan_in)
+		return
+	iterator = iter(source)
+	spills = []
+	try:
+		block_size = 1
+		while True:
+			chunk, used, exhausted = _read_chunk(iterator, memory_limit)
+			tim_sort(chunk, key = key, reverse = reverse)
+			if exhausted and len(spills) == 0:
+				yield from chunk
+				return
+			if len(chunk) > 0:
+				# a merge reads one block from each of fan_in runs at a time, which keeps it within the memory limit
+				block_size = max(block_size, memory_limit * len(chunk) // (fan_in * used))
+				spills.append(_spill_run(chunk, temp_dir, block_size))
+			chunk = None
+			if exhausted:
+				break
+		# merge consecutive groups of runs into longer runs until a single merge of at most fan_in runs is left,
+		# merging neighbours keeps equal keys in input order
+		while len(spills) > fan_in:
+			# every pass takes the runs from the front and appends the merged run, so the list always holds every
+			# live file for the cleanup below
+			remaining = len(spills)
+			while remaining > 0:
+				group = spills[:min(fan_in, remaining)]
+				runs = heapq.merge(*[_read_run(path) for path in group], key = key, reverse = reverse)
+				spills.append(_spill_run(runs, temp_dir, block_size))
+				del spills[:len(group)]
+				remaining -= len(group)
+				for path in group:
+					os.remove(path)
+		yield from heapq.merge(*[_read_run(path) for path in spills], key = key, reverse = reverse)
+	finally:
+		for path in spills:
+			os.remove(path)
+
+
 # TODO: apply performance tricks to smaller sized chunks
-def natural_merge_sort(array):
+@_keyed_sort
+def natural_merge_sort(array, in_place = False, cutoff = None):
+	cutoff = _cutoff("natural_merge_sort", cutoff)
 	length = len(array)
-	aux = [None for i in range(length)]
+	aux = None if in_place else [None for i in range(length)]
 	while True:
 		start = 0
 		mid = 1
@@ -130,8 +518,10 @@ def natural_merge_sort(array):
 				if array[end] < array[end - 1]:
 					break
 				end += 1
-			if end - start < 16:
+			if end - start < cutoff:
 				_range_insertion_sort(array, start, end)
+			elif in_place:
+				_in_place_merge(array, start, mid, end)
 			else:
 				for i in range(start, end):
 					aux[i] = array[i]
@@ -143,6 +533,328 @@ def natural_merge_sort(array):
 			break
 
 
+_MIN_GALLOP = 7
+
+
+def _min_run_length(n):
+	r = 0
+	while n >= 64:
+		r |= n & 1
+		n >>= 1
+	return n + r
+
+
+def _count_run_and_make_ascending(array, low, high):
+	run_high = low + 1
+	if run_high == high:
+		return 1
+	if array[run_high] < array[low]:
+		run_high += 1
+		while run_high < high and array[run_high] < array[run_high - 1]:
+			run_high += 1
+		# only strictly descending runs are reversed so equal elements keep their order
+		array[low:run_high] = array[low:run_high][::-1]
+	else:
+		run_high += 1
+		while run_high < high and not array[run_high] < array[run_high - 1]:
+			run_high += 1
+	return run_high - low
+
+
+def _binary_insertion_sort(array, low, high, start):
+	if start == low:
+		start += 1
+	for i in range(start, high):
+		pivot = array[i]
+		left = low
+		right = i
+		while left < right:
+			mid = (left + right) // 2
+			if pivot < array[mid]:
+				right = mid
+			else:
+				left = mid + 1
+		array[left + 1:i + 1] = array[left:i]
+		array[left] = pivot
+
+
+def _gallop_left(key, array, base, length, hint):
+	last_ofs = 0
+	ofs = 1
+	if array[base + hint] < key:
+		max_ofs = length - hint
+		while ofs < max_ofs and array[base + hint + ofs] < key:
+			last_ofs = ofs
+			ofs = (ofs << 1) + 1
+		if ofs > max_ofs:
+			ofs = max_ofs
+		last_ofs += hint
+		ofs += hint
+	else:
+		max_ofs = hint + 1
+		while ofs < max_ofs and not array[base + hint - ofs] < key:
+			last_ofs = ofs
+			ofs = (ofs << 1) + 1
+		if ofs > max_ofs:
+			ofs = max_ofs
+		last_ofs, ofs = hint - ofs, hint - last_ofs
+	last_ofs += 1
+	while last_ofs < ofs:
+		m = last_ofs + ((ofs - last_ofs) >> 1)
+		if array[base + m] < key:
+			last_ofs = m + 1
+		else:
+			ofs = m
+	return ofs
+
+
+def _gallop_right(key, array, base, length, hint):
+	last_ofs = 0
+	ofs = 1
+	if key < array[base + hint]:
+		max_ofs = hint + 1
+		while ofs < max_ofs and key < array[base + hint - ofs]:
+			last_ofs = ofs
+			ofs = (ofs << 1) + 1
+		if ofs > max_ofs:
+			ofs = max_ofs
+		last_ofs, ofs = hint - ofs, hint - last_ofs
+	else:
+		max_ofs = length - hint
+		while ofs < max_ofs and not key < array[base + hint + ofs]:
+			last_ofs = ofs
+			ofs = (ofs << 1) + 1
+		if ofs > max_ofs:
+			ofs = max_ofs
+		last_ofs += hint
+		ofs += hint
+	last_ofs += 1
+	while last_ofs < ofs:
+		m = last_ofs + ((ofs - last_ofs) >> 1)
+		if key < array[base + m]:
+			ofs = m
+		else:
+			last_ofs = m + 1
+	return ofs
+
+
+class _TimSort:
+
+	def __init__(self, array, low, high):
+		self._array = array
+		self._low = low
+		self._high = high
+		self._min_gallop = _MIN_GALLOP
+		self._runs = []
+
+	def sort(self):
+		array = self._array
+		low = self._low
+		high = self._high
+		remaining = high - low
+		if remaining < 2:
+			return
+		min_run = _min_run_length(remaining)
+		while remaining > 0:
+			run_length = _count_run_and_make_ascending(array, low, high)
+			if run_length < min_run:
+				forced = min(remaining, min_run)
+				_binary_insertion_sort(array, low, low + forced, low + run_length)
+				run_length = forced
+			self._runs.append((low, run_length))
+			self._merge_collapse()
+			low += run_length
+			remaining -= run_length
+		self._merge_force_collapse()
+
+	def _merge_collapse(self):
+		runs = self._runs
+		while len(runs) > 1:
+			n = len(runs) - 2
+			if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+					(n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+				if runs[n - 1][1] < runs[n + 1][1]:
+					n -= 1
+			elif runs[n][1] > runs[n + 1][1]:
+				break
+			self._merge_at(n)
+
+	def _merge_force_collapse(self):
+		runs = self._runs
+		while len(runs) > 1:
+			n = len(runs) - 2
+			if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+				n -= 1
+			self._merge_at(n)
+
+	def _merge_at(self, i):
+		array = self._array
+		base1, len1 = self._runs[i]
+		base2, len2 = self._runs[i + 1]
+		self._runs[i] = (base1, len1 + len2)
+		del self._runs[i + 1]
+		# elements of run 1 already in place before the start of run 2 are skipped
+		k = _gallop_right(array[base2], array, base1, len1, 0)
+		base1 += k
+		len1 -= k
+		if len1 == 0:
+			return
+		# elements of run 2 already in place after the end of run 1 are skipped
+		len2 = _gallop_left(array[base1 + len1 - 1], array, base2, len2, len2 - 1)
+		if len2 == 0:
+			return
+		if len1 <= len2:
+			self._merge_low(base1, len1, base2, len2)
+		else:
+			self._merge_high(base1, len1, base2, len2)
+
+	def _merge_low(self, base1, len1, base2, len2):
+		array = self._array
+		tmp = array[base1:base1 + len1]
+		cursor1 = 0
+		cursor2 = base2
+		dest = base1
+		end1 = len1
+		end2 = base2 + len2
+		min_gallop = self._min_gallop
+		while cursor1 < end1 and cursor2 < end2:
+			count1 = 0
+			count2 = 0
+			while True:
+				if array[cursor2] < tmp[cursor1]:
+					array[dest] = array[cursor2]
+					dest += 1
+					cursor2 += 1
+					count2 += 1
+					count1 = 0
+					if cursor2 == end2:
+						break
+				else:
+					array[dest] = tmp[cursor1]
+					dest += 1
+					cursor1 += 1
+					count1 += 1
+					count2 = 0
+					if cursor1 == end1:
+						break
+				if count1 >= min_gallop or count2 >= min_gallop:
+					break
+			if cursor1 == end1 or cursor2 == end2:
+				break
+			while True:
+				count1 = _gallop_right(array[cursor2], tmp, cursor1, end1 - cursor1, 0)
+				if count1 != 0:
+					array[dest:dest + count1] = tmp[cursor1:cursor1 + count1]
+					dest += count1
+					cursor1 += count1
+					if cursor1 == end1:
+						break
+				array[dest] = array[cursor2]
+				dest += 1
+				cursor2 += 1
+				if cursor2 == end2:
+					break
+				count2 = _gallop_left(tmp[cursor1], array, cursor2, end2 - cursor2, 0)
+				if count2 != 0:
+					array[dest:dest + count2] = array[cursor2:cursor2 + count2]
+					dest += count2
+					cursor2 += count2
+					if cursor2 == end2:
+						break
+				array[dest] = tmp[cursor1]
+				dest += 1
+				cursor1 += 1
+				if cursor1 == end1:
+					break
+				min_gallop -= 1
+				if count1 < _MIN_GALLOP and count2 < _MIN_GALLOP:
+					break
+			if cursor1 == end1 or cursor2 == end2:
+				break
+			if min_gallop < 0:
+				min_gallop = 0
+			min_gallop += 2
+		self._min_gallop = max(1, min_gallop)
+		# whatever is left of run 2 is already in place
+		if cursor1 < end1:
+			array[dest:dest + end1 - cursor1] = tmp[cursor1:end1]
+
+	def _merge_high(self, base1, len1, base2, len2):
+		array = self._array
+		tmp = array[base2:base2 + len2]
+		cursor1 = base1 + len1 - 1
+		cursor2 = len2 - 1
+		dest = base2 + len2 - 1
+		min_gallop = self._min_gallop
+		while cursor1 >= base1 and cursor2 >= 0:
+			count1 = 0
+			count2 = 0
+			while True:
+				if tmp[cursor2] < array[cursor1]:
+					array[dest] = array[cursor1]
+					dest -= 1
+					cursor1 -= 1
+					count1 += 1
+					count2 = 0
+					if cursor1 < base1:
+						break
+				else:
+					array[dest] = tmp[cursor2]
+					dest -= 1
+					cursor2 -= 1
+					count2 += 1
+					count1 = 0
+					if cursor2 < 0:
+						break
+				if count1 >= min_gallop or count2 >= min_gallop:
+					break
+			if cursor1 < base1 or cursor2 < 0:
+				break
+			while True:
+				remaining1 = cursor1 - base1 + 1
+				count1 = remaining1 - _gallop_right(tmp[cursor2], array, base1, remaining1, remaining1 - 1)
+				if count1 != 0:
+					dest -= count1
+					cursor1 -= count1
+					array[dest + 1:dest + 1 + count1] = array[cursor1 + 1:cursor1 + 1 + count1]
+					if cursor1 < base1:
+						break
+				array[dest] = tmp[cursor2]
+				dest -= 1
+				cursor2 -= 1
+				if cursor2 < 0:
+					break
+				count2 = cursor2 + 1 - _gallop_left(array[cursor1], tmp, 0, cursor2 + 1, cursor2)
+				if count2 != 0:
+					dest -= count2
+					cursor2 -= count2
+					array[dest + 1:dest + 1 + count2] = tmp[cursor2 + 1:cursor2 + 1 + count2]
+					if cursor2 < 0:
+						break
+				array[dest] = array[cursor1]
+				dest -= 1
+				cursor1 -= 1
+				if cursor1 < base1:
+					break
+				min_gallop -= 1
+				if count1 < _MIN_GALLOP and count2 < _MIN_GALLOP:
+					break
+			if cursor1 < base1 or cursor2 < 0:
+				break
+			if min_gallop < 0:
+				min_gallop = 0
+			min_gallop += 2
+		self._min_gallop = max(1, min_gallop)
+		# whatever is left of run 1 is already in place
+		if cursor2 >= 0:
+			array[base1:base1 + cursor2 + 1] = tmp[:cursor2 + 1]
+
+
+@_keyed_sort
+def tim_sort(array):
+	_TimSort(array, 0, len(array)).sort()
+
+
 def _merge_count_inversion(input_array, aux, low, mid, high):
 	a_pos = low
 	b_pos = mid
@@ -172,7 +884,31 @@ def _merge_count_inversion(input_array, aux, low, mid, high):
 	return count
 
 
+def _numpy_inversions(values):
+	n = len(values)
+	size = 1
+	while size < n:
+		size *= 2
+	# padding with the maximum at the end adds no inversions
+	merged = numpy.full(size, values.max(), dtype = values.dtype)
+	merged[:n] = values
+	count = 0
+	width = 1
+	while width < size:
+		rows = merged.reshape(-1, 2 * width)
+		order = numpy.argsort(rows, axis = 1, kind = "stable")
+		positions = numpy.argsort(order, axis = 1, kind = "stable")[:, width:]
+		# an element of the right half at merged position p preceded by j right elements jumps width - (p - j) left elements
+		count += int((width - positions + numpy.arange(width)).sum())
+		merged = numpy.take_along_axis(rows, order, axis = 1).ravel()
+		width *= 2
+	return count
+
+
 def inversions(array):
+	values = _numeric_array(array)
+	if values is not None:
+		return _numpy_inversions(values)
 	array = list(array)
 	segment_size = 1
 	length = len(array)
@@ -193,6 +929,68 @@ def inversions(array):
 	return count
 
 
+def fenwick_inversions(array):
+	ranks = {}
+	for v in sorted(set(array)):
+		ranks[v] = len(ranks) + 1
+	size = len(ranks)
+	# binary indexed tree over the compressed ranks of the elements seen so far
+	tree = [0] * (size + 1)
+	count = 0
+	for seen, v in enumerate(array):
+		r = ranks[v]
+		not_greater = 0
+		i = r
+		while i > 0:
+			not_greater += tree[i]
+			i -= i & -i
+		count += seen - not_greater
+		i = r
+		while i <= size:
+			tree[i] += 1
+			i += i & -i
+	return count
+
+
+def _count_chunk_inversions(chunk):
+	count = fenwick_inversions(chunk)
+	chunk.sort()
+	return count, chunk
+
+
+def _count_cross_inversions(pair):
+	(count_a, a), (count_b, b) = pair
+	count = count_a + count_b
+	length_a = len(a)
+	i = 0
+	# every element of the earlier chunk greater than v forms an inversion with it
+	for v in b:
+		i = bisect.bisect_right(a, v, i)
+		count += length_a - i
+	a.extend(b)
+	a.sort()
+	return count, a
+
+
+def parallel_inversions(array, workers = None, threshold = 100000):
+	length = len(array)
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	if workers < 2 or length < 2 or length < threshold:
+		return fenwick_inversions(array)
+	chunk_size = -(-length // workers)
+	chunks = [list(array[i:i + chunk_size]) for i in range(0, length, chunk_size)]
+	with multiprocessing.Pool(min(workers, len(chunks))) as pool:
+		counted = pool.map(_count_chunk_inversions, chunks)
+		while len(counted) > 1:
+			pairs = [(counted[i], counted[i + 1]) for i in range(0, len(counted) - 1, 2)]
+			merged = pool.map(_count_cross_inversions, pairs)
+			if len(counted) % 2 == 1:
+				merged.append(counted[-1])
+			counted = merged
+	return counted[0][0]
+
+
 def naive_inversions(array):
 	count = 0
 	for i in range(len(array)):
@@ -240,10 +1038,10 @@ def _partition(array, low, high):
 
 def _sampling_partition(array, low, high, sample_size):
 	sample = []
-	for i in range(sample_size):
-		sample.append((i, array[i]))
-	median = select(sample, sample_size // 2 + 1)
-	exchange(array, 0, median[0])
+	for i in range(low, low + sample_size):
+		sample.append((array[i], i))
+	median = select(sample, sample_size // 2)
+	exchange(array, low, median[1])
 	return _partition(array, low, high)
 
 
@@ -287,130 +1085,371 @@ def _three_way_partitioning(array, low, high):
 	return j, i
 
 
-def _quick_sort_recursive(array, low, high):
-	if high - low < 16:
-		_range_insertion_sort(array, low, high)
+def _median_of_three(array, a, b, c):
+	if array[a] < array[b]:
+		if array[b] < array[c]:
+			return b
+		if array[a] < array[c]:
+			return c
+		return a
+	if array[a] < array[c]:
+		return a
+	if array[b] < array[c]:
+		return c
+	return b
+
+
+def _choose_pivot(array, low, high):
+	length = high - low
+	mid = low + length // 2
+	last = high - 1
+	if length > 40:
+		# Tukey's ninther: median of the medians of three evenly spaced triples
+		step = length // 8
+		return _median_of_three(array, _median_of_three(array, low, low + step, low + 2 * step),
+		                        _median_of_three(array, mid - step, mid, mid + step),
+		                        _median_of_three(array, last - 2 * step, last - step, last))
+	return _median_of_three(array, low, mid, last)
+
+
+def _quick_sort_recursive(array, low, high, cutoff):
+	if high - low < cutoff:
+		_small_sort(array, low, high)
 		return
 	middle = _partition(array, low, high)
-	_quick_sort_recursive(array, low, middle)
-	_quick_sort_recursive(array, middle + 1, high)
+	_quick_sort_recursive(array, low, middle, cutoff)
+	_quick_sort_recursive(array, middle + 1, high, cutoff)
 
 
-def _quick_sort_sampling_recursive(array, low, high, sample_size):
-	if high - low < 16:
-		_range_insertion_sort(array, low, high)
+def _quick_sort_sampling_recursive(array, low, high, sample_size, cutoff):
+	if high - low < cutoff:
+		_small_sort(array, low, high)
 		return
 	middle = _sampling_partition(array, low, high, sample_size)
-	_quick_sort_sampling_recursive(array, low, middle, sample_size)
-	_quick_sort_sampling_recursive(array, middle + 1, high, sample_size)
+	_quick_sort_sampling_recursive(array, low, middle, sample_size, cutoff)
+	_quick_sort_sampling_recursive(array, middle + 1, high, sample_size, cutoff)
 
 
-def _quick_sort_threeway_recursive(array, low, high):
-	if high - low < 16:
-		_range_insertion_sort(array, low, high)
+def _quick_sort_threeway_recursive(array, low, high, cutoff):
+	if high - low < cutoff:
+		_small_sort(array, low, high)
 		return
 	j, i = _three_way_partitioning(array, low, high)
-	_quick_sort_threeway_recursive(array, low, j + 1)
-	_quick_sort_threeway_recursive(array, i, high)
+	_quick_sort_threeway_recursive(array, low, j + 1, cutoff)
+	_quick_sort_threeway_recursive(array, i, high, cutoff)
 
 
-def quick_sort(array):
+@_keyed_sort
+def quick_sort(array, cutoff = None):
 	random.shuffle(array)
-	_quick_sort_recursive(array, 0, len(array))
+	_quick_sort_recursive(array, 0, len(array), _cutoff("quick_sort", cutoff))
 
 
-def iterative_quick_sort(array):
-	random.shuffle(array)
+@_keyed_sort
+def iterative_quick_sort(array, three_way = False, cutoff = None):
+	cutoff = _cutoff("iterative_quick_sort", cutoff)
 	to_do_stack = []
-	to_do_stack.append((0, len(array)))
+	# every range carries the partitioning depth it has left, like intro sort, so bad pivots cost n log n at most
+	to_do_stack.append((0, len(array), 2 * len(array).bit_length()))
 	while len(to_do_stack) != 0:
-		segment = to_do_stack.pop()
-		segment_length = segment[1] - segment[0]
-		if segment_length < 15:
-			_range_insertion_sort(array, segment[0], segment[1])
-			continue
-		middle = _partition(array, segment[0], segment[1])
-		length_a = middle - segment[0]
-		length_b = segment[1] - middle - 1
-		if length_a >= length_b:
-			to_do_stack.append((segment[0], middle))
-			to_do_stack.append((middle + 1, segment[1]))
+		low, high, depth_limit = to_do_stack.pop()
+		while high - low >= cutoff:
+			if depth_limit == 0:
+				_range_heap_sort(array, low, high)
+				break
+			depth_limit -= 1
+			exchange(array, low, _choose_pivot(array, low, high))
+			if three_way:
+				j, i = _three_way_partitioning(array, low, high)
+				left_high = j + 1
+				right_low = i
+			else:
+				middle = _partition(array, low, high)
+				left_high = middle
+				right_low = middle + 1
+			# the larger side waits on the stack while the smaller side is processed, so the stack stays under log(n)
+			if left_high - low > high - right_low:
+				to_do_stack.append((low, left_high, depth_limit))
+				low = right_low
+			else:
+				to_do_stack.append((right_low, high, depth_limit))
+				high = left_high
 		else:
-			to_do_stack.append((segment[0], middle))
-			to_do_stack.append((middle + 1, segment[1]))
+			_small_sort(array, low, high)
 
 
-def sampling_quick_sort(array, sample_size = 3):
+@_keyed_sort
+def sampling_quick_sort(array, sample_size = 3, cutoff = None):
 	random.shuffle(array)
-	_quick_sort_sampling_recursive(array, 0, len(array), sample_size)
+	_quick_sort_sampling_recursive(array, 0, len(array), sample_size, _cutoff("sampling_quick_sort", cutoff))
 
 
-def threeway_quick_sort(array):
+@_keyed_sort
+def threeway_quick_sort(array, cutoff = None):
 	random.shuffle(array)
-	_quick_sort_threeway_recursive(array, 0, len(array))
+	_quick_sort_threeway_recursive(array, 0, len(array), _cutoff("threeway_quick_sort", cutoff))
 
 
-def _demote(array, k, n):
-	temp = array[k]
+def _demote(array, k, n, low = 0):
+	temp = array[low + k]
 	while k * 2 + 1 < n:
 		to_exchange = k * 2 + 1
-		if to_exchange + 1 < n and array[to_exchange] < array[to_exchange + 1]:
+		if to_exchange + 1 < n and array[low + to_exchange] < array[low + to_exchange + 1]:
 			to_exchange += 1
-		if temp < array[to_exchange]:
-			array[k] = array[to_exchange]
+		if temp < array[low + to_exchange]:
+			array[low + k] = array[low + to_exchange]
 		else:
 			break
 		k = to_exchange
-	array[k] = temp
+	array[low + k] = temp
 
 
-def heap_sort(array):
-	n = len(array)
-	i = n // 2
+def _range_heap_sort(array, low, high):
+	n = high - low
+	i = n // 2 - 1
 	while i >= 0:
-		_demote(array, i, n)
+		_demote(array, i, n, low)
 		i -= 1
 	while n > 1:
-		exchange(array, 0, n - 1)
+		exchange(array, low, low + n - 1)
 		n -= 1
-		_demote(array, 0, n)
+		_demote(array, 0, n, low)
 
 
-def select(array, k):
-	random.shuffle(array)
-	high = len(array)
-	low = 0
+@_keyed_sort
+def heap_sort(array):
+	values = _numeric_array(array)
+	if values is not None:
+		values.sort(kind = "heapsort")
+		array[:] = values.tolist()
+		return
+	_range_heap_sort(array, 0, len(array))
+
+
+def _intro_sort_recursive(array, low, high, depth_limit, cutoff):
+	while high - low >= cutoff:
+		if depth_limit == 0:
+			_range_heap_sort(array, low, high)
+			return
+		depth_limit -= 1
+		exchange(array, low, _choose_pivot(array, low, high))
+		middle = _partition(array, low, high)
+		# recurse into the smaller side and loop over the larger one
+		if middle - low < high - middle - 1:
+			_intro_sort_recursive(array, low, middle, depth_limit, cutoff)
+			low = middle + 1
+		else:
+			_intro_sort_recursive(array, middle + 1, high, depth_limit, cutoff)
+			high = middle
+	_small_sort(array, low, high)
+
+
+@_keyed_sort
+def intro_sort(array, cutoff = None):
+	_intro_sort_recursive(array, 0, len(array), 2 * len(array).bit_length(), _cutoff("intro_sort", cutoff))
+
+
+_BLOCK_SIZE = 64
+_PARTIAL_INSERTION_LIMIT = 8
+
+
+def _partial_insertion_sort(array, low, high):
+	# gives up once too many elements had to move, returns whether the range ended up sorted
+	moved = 0
+	for i in range(low + 1, high):
+		insertion_point = i
+		insertion_val = array[i]
+		while insertion_point > low and insertion_val < array[insertion_point - 1]:
+			array[insertion_point] = array[insertion_point - 1]
+			insertion_point -= 1
+		array[insertion_point] = insertion_val
+		moved += i - insertion_point
+		if moved > _PARTIAL_INSERTION_LIMIT:
+			return False
+	return True
+
+
+def _partition_left(array, low, high):
+	# used when the pivot equals the element before the range, so nothing in the range is smaller than it
+	pivot = array[low]
+	first = low + 1
+	last = high - 1
 	while True:
+		while first <= last and not pivot < array[first]:
+			first += 1
+		while first <= last and pivot < array[last]:
+			last -= 1
+		if first >= last:
+			break
+		array[first], array[last] = array[last], array[first]
+	array[low], array[last] = array[last], array[low]
+	return last
+
+
+def _block_partition(array, low, high):
+	pivot = array[low]
+	first = low + 1
+	last = high
+	while first < last and array[first] < pivot:
+		first += 1
+	while first < last and not array[last - 1] < pivot:
+		last -= 1
+	already_partitioned = first >= last
+	offsets_left = []
+	offsets_right = []
+	while True:
+		needed = 0
+		if len(offsets_left) == 0:
+			needed += _BLOCK_SIZE
+		if len(offsets_right) == 0:
+			needed += _BLOCK_SIZE
+		if last - first < needed:
+			break
+		# collect the misplaced elements of a whole block before swapping any of them
+		if len(offsets_left) == 0:
+			offsets_left = [i for i in range(first, first + _BLOCK_SIZE) if not array[i] < pivot]
+			first += _BLOCK_SIZE
+		if len(offsets_right) == 0:
+			offsets_right = [i for i in range(last - 1, last - 1 - _BLOCK_SIZE, -1) if array[i] < pivot]
+			last -= _BLOCK_SIZE
+		swaps = min(len(offsets_left), len(offsets_right))
+		for i, j in zip(offsets_left[:swaps], offsets_right[:swaps]):
+			array[i], array[j] = array[j], array[i]
+		offsets_left = offsets_left[swaps:]
+		offsets_right = offsets_right[swaps:]
+	# move leftover misplaced elements next to the unscanned middle and finish it element by element
+	for i in reversed(offsets_left):
+		first -= 1
+		array[i], array[first] = array[first], array[i]
+	for i in reversed(offsets_right):
+		array[i], array[last] = array[last], array[i]
+		last += 1
+	while True:
+		while first < last and array[first] < pivot:
+			first += 1
+		while first < last and not array[last - 1] < pivot:
+			last -= 1
+		if first >= last:
+			break
+		last -= 1
+		array[first], array[last] = array[last], array[first]
+		first += 1
+	pivot_pos = first - 1
+	array[low], array[pivot_pos] = array[pivot_pos], array[low]
+	return pivot_pos, already_partitioned
+
+
+def _pdq_sort_loop(array, low, high, bad_allowed, leftmost, cutoff):
+	while True:
+		size = high - low
+		if size < cutoff:
+			_small_sort(array, low, high)
+			return
+		exchange(array, low, _choose_pivot(array, low, high))
+		if not leftmost and not array[low - 1] < array[low]:
+			low = _partition_left(array, low, high) + 1
+			continue
+		pivot_pos, already_partitioned = _block_partition(array, low, high)
+		left_size = pivot_pos - low
+		right_size = high - pivot_pos - 1
+		if left_size < size // 8 or right_size < size // 8:
+			bad_allowed -= 1
+			if bad_allowed == 0:
+				_range_heap_sort(array, low, high)
+				return
+			# break up the pattern that produced the bad partition
+			if left_size >= 16:
+				exchange(array, low, low + left_size // 4)
+				exchange(array, pivot_pos - 1, pivot_pos - left_size // 4)
+			if right_size >= 16:
+				exchange(array, pivot_pos + 1, pivot_pos + 1 + right_size // 4)
+				exchange(array, high - 1, high - right_size // 4)
+		elif already_partitioned and _partial_insertion_sort(array, low, pivot_pos) and \
+				_partial_insertion_sort(array, pivot_pos + 1, high):
+			return
+		if left_size < right_size:
+			_pdq_sort_loop(array, low, pivot_pos, bad_allowed, leftmost, cutoff)
+			low = pivot_pos + 1
+			leftmost = False
+		else:
+			_pdq_sort_loop(array, pivot_pos + 1, high, bad_allowed, False, cutoff)
+			high = pivot_pos
+
+
+@_keyed_sort
+def pdq_sort(array, cutoff = None):
+	_pdq_sort_loop(array, 0, len(array), len(array).bit_length(), True, _cutoff("pdq_sort", cutoff))
+
+
+def select(array, k):
+	values = _numeric_array(array)
+	if values is not None:
+		values.partition(k)
+		array[:] = values.tolist()
+		return array[k]
+	return nth_element(array, k)
+
+
+def _median_of_medians(array, low, high):
+	medians_end = low
+	for group in range(low, high, 5):
+		group_high = min(group + 5, high)
+		_small_sort(array, group, group_high)
+		exchange(array, medians_end, group + (group_high - group) // 2)
+		medians_end += 1
+	mid = low + (medians_end - low) // 2
+	_select_range(array, low, medians_end, mid, 0)
+	return mid
+
+
+def _select_range(array, low, high, k, depth_limit):
+	while high - low > 16:
+		# once the sampled pivots stop shrinking the range fast enough, median of medians guarantees linear time
+		if depth_limit == 0:
+			pivot = _median_of_medians(array, low, high)
+		else:
+			depth_limit -= 1
+			pivot = _choose_pivot(array, low, high)
+		exchange(array, low, pivot)
 		fixed = _partition(array, low, high)
 		if fixed == k:
-			return array[k]
+			return
 		if fixed > k:
 			high = fixed
-		if fixed < k:
+		else:
 			low = fixed + 1
+	_small_sort(array, low, high)
 
 
-def doubling_test(alg1, start_size = 16, sample_size = 5):
-	to_sort = []
-	for i in range(start_size):
-		to_sort.append(random.randint(0, start_size))
-	prev_time = 0
-	while True:
-		time_sum = 0
-		for i in range(sample_size):
-			timer = timeit.Timer(functools.partial(alg1, to_sort))
-			time_sum += timer.timeit(1)
-		avg = time_sum / sample_size
-		compare_to_prev = 0
-		if prev_time != 0:
-			compare_to_prev = avg / prev_time
-		print("Current Size: {}, Sample Size: {}, Avg Time: {}, {} divided by previous".format(start_size, sample_size,
-		                                                                                       avg, compare_to_prev))
-		prev_time = avg
-		start_size *= 2
-		to_sort.clear()
-		for i in range(start_size):
-			to_sort.append(random.randint(0, start_size))
+def nth_element(array, k):
+	if not 0 <= k < len(array):
+		raise IndexError("k is out of range")
+	_select_range(array, 0, len(array), k, 2 * len(array).bit_length())
+	return array[k]
+
+
+def partial_sort(array, k):
+	k = min(k, len(array))
+	if k <= 0:
+		return
+	if k < len(array):
+		nth_element(array, k)
+	_intro_sort_recursive(array, 0, k, 2 * k.bit_length(), _cutoff("intro_sort", None))
+
+
+def top_k(iterable, k, key = None):
+	if k <= 0:
+		return []
+	heap = []
+	for i, item in enumerate(iterable):
+		item_key = item if key is None else key(item)
+		# the heap holds the k largest seen so far with the smallest of them on top
+		if len(heap) < k:
+			heapq.heappush(heap, (item_key, -i, item))
+		elif heap[0][0] < item_key:
+			heapq.heapreplace(heap, (item_key, -i, item))
+	heap.sort(reverse = True)
+	return [entry[2] for entry in heap]
 
 
 def random_array(n, low = 0, high = 1000):
@@ -453,29 +1492,22 @@ def lsd_string_sort(strings, charset):
 		type_counting_sort(strings, charset, lambda t: t[i])
 
 
-def _range_string_insertion_sort(array, low, high, index):
-	for i in range(low + 1, high):
-		insertion_point = i
-		insertion_val = array[i]
-		while insertion_point > low and array[insertion_point - 1][index:] > insertion_val[index:]:
-			array[insertion_point] = array[insertion_point - 1]
-			insertion_point -= 1
-		array[insertion_point] = insertion_val
-
-
-def msd_string_sort(strings, charset):
+def msd_string_sort(strings, charset, cutoff = None):
 	type_enum = {}
 	i = 0
 	for t in charset:
 		type_enum[t] = i
 		i += 1
 	aux = [None for i in range(len(strings))]
-	msd_string_sort_recursive(strings, aux, 0, len(strings), 0, type_enum)
+	msd_string_sort_recursive(strings, aux, 0, len(strings), 0, type_enum, _cutoff("msd_string_sort", cutoff))
 
 
-def msd_string_sort_recursive(strings, aux, low, high, current, type_enum):
-	if high <= low + 15:
-		_range_string_insertion_sort(strings, low, high, current)
+def msd_string_sort_recursive(strings, aux, low, high, current, type_enum, cutoff = None):
+	if cutoff is None:
+		cutoff = _cutoff("msd_string_sort", cutoff)
+	if high - low < cutoff:
+		# every string in the range shares the first current characters, so whole strings compare the same as suffixes
+		_range_insertion_sort(strings, low, high)
 		return
 	type_count = [0 for i in range(len(type_enum) + 2)]
 	for i in range(low, high):
@@ -502,8 +1534,315 @@ def msd_string_sort_recursive(strings, aux, low, high, current, type_enum):
 	for i in range(low, high):
 		strings[i] = aux[i - low]
 	for type_i in type_enum.values():
-		msd_string_sort_recursive(strings, aux, low + type_count[type_i], low + type_count[type_i + 1], current + 1,
-		                          type_enum)
+		if type_count[type_i + 1] - type_count[type_i] > 1:
+			msd_string_sort_recursive(strings, aux, low + type_count[type_i], low + type_count[type_i + 1], current + 1,
+			                          type_enum, cutoff)
+
+
+def _exchange_pair(keys, values, i, j):
+	exchange(keys, i, j)
+	if values is not None:
+		exchange(values, i, j)
+
+
+def _range_pair_insertion_sort(keys, values, low, high):
+	if values is None:
+		_range_insertion_sort(keys, low, high)
+		return
+	for i in range(low + 1, high):
+		insertion_point = i
+		insertion_key = keys[i]
+		insertion_val = values[i]
+		while insertion_point > low and insertion_key < keys[insertion_point - 1]:
+			keys[insertion_point] = keys[insertion_point - 1]
+			values[insertion_point] = values[insertion_point - 1]
+			insertion_point -= 1
+		keys[insertion_point] = insertion_key
+		values[insertion_point] = insertion_val
+
+
+def _quick3_string_sort(keys, values, low, high, cutoff):
+	to_do_stack = [(low, high, 0)]
+	while len(to_do_stack) != 0:
+		low, high, d = to_do_stack.pop()
+		if high - low < cutoff:
+			# the range shares its first d symbols, so whole keys compare the same as their suffixes
+			_range_pair_insertion_sort(keys, values, low, high)
+			continue
+		_exchange_pair(keys, values, low, low + (high - low) // 2)
+		pivot = keys[low]
+		pivot_ended = d >= len(pivot)
+		if not pivot_ended:
+			v = pivot[d]
+		lt = low
+		gt = high - 1
+		i = low + 1
+		while i <= gt:
+			key = keys[i]
+			if d >= len(key):
+				less = not pivot_ended
+				greater = False
+			elif pivot_ended:
+				less = False
+				greater = True
+			else:
+				c = key[d]
+				less = c < v
+				greater = v < c
+			if less:
+				_exchange_pair(keys, values, lt, i)
+				lt += 1
+				i += 1
+			elif greater:
+				_exchange_pair(keys, values, i, gt)
+				gt -= 1
+			else:
+				i += 1
+		if lt - low > 1:
+			to_do_stack.append((low, lt, d))
+		if high - gt > 2:
+			to_do_stack.append((gt + 1, high, d))
+		if not pivot_ended and gt + 1 - lt > 1:
+			to_do_stack.append((lt, gt + 1, d + 1))
+
+
+def quick3_string_sort(array, key = None, cutoff = None):
+	cutoff = _cutoff("quick3_string_sort", cutoff)
+	if key is None:
+		_quick3_string_sort(array, None, 0, len(array), cutoff)
+		return
+	keys = [key(v) for v in array]
+	values = list(array)
+	_quick3_string_sort(keys, values, 0, len(array), cutoff)
+	array[:] = values
+
+
+_FLOAT_SIGN = 1 << 63
+_FLOAT_MASK = (1 << 64) - 1
+
+
+def _radix_digit_bits(n):
+	if n >= 1 << 16:
+		return 16
+	return 8
+
+
+def _lsd_radix_sort_keys(keys, key_bits, digit_bits):
+	n = len(keys)
+	radix = 1 << digit_bits
+	mask = radix - 1
+	aux = [0] * n
+	shift = 0
+	while shift < key_bits:
+		count = [0] * (radix + 1)
+		for k in keys:
+			count[((k >> shift) & mask) + 1] += 1
+		# a pass where every key has the same digit would not move anything
+		if max(count) < n:
+			for r in range(radix):
+				count[r + 1] += count[r]
+			for k in keys:
+				d = (k >> shift) & mask
+				aux[count[d]] = k
+				count[d] += 1
+			keys, aux = aux, keys
+		shift += digit_bits
+	return keys
+
+
+def lsd_integer_sort(array, digit_bits = None):
+	n = len(array)
+	if n < 2:
+		return
+	if digit_bits is None:
+		digit_bits = _radix_digit_bits(n)
+	low = min(array)
+	key_bits = (max(array) - low).bit_length()
+	if low == 0:
+		keys = _lsd_radix_sort_keys(array, key_bits, digit_bits)
+		if keys is not array:
+			array[:] = keys
+	else:
+		keys = _lsd_radix_sort_keys([v - low for v in array], key_bits, digit_bits)
+		array[:] = [k + low for k in keys]
+
+
+def lsd_float_sort(array, digit_bits = None):
+	n = len(array)
+	if n < 2:
+		return
+	if digit_bits is None:
+		digit_bits = _radix_digit_bits(n)
+	bits = struct.unpack("<{}Q".format(n), struct.pack("<{}d".format(n), *array))
+	# flipping the sign bit of positives and every bit of negatives makes the unsigned order match the float order
+	keys = [b ^ _FLOAT_MASK if b & _FLOAT_SIGN else b | _FLOAT_SIGN for b in bits]
+	keys = _lsd_radix_sort_keys(keys, 64, digit_bits)
+	bits = [k ^ _FLOAT_SIGN if k & _FLOAT_SIGN else k ^ _FLOAT_MASK for k in keys]
+	array[:] = struct.unpack("<{}d".format(n), struct.pack("<{}Q".format(n), *bits))
+
+
+def _byte_counting_sort(view, signed):
+	data = view.tobytes()
+	# bytes.count scans in C, so no element is ever turned into a Python int
+	order = list(range(128, 256)) + list(range(128)) if signed else range(256)
+	view[:] = b"".join(bytes((v,)) * data.count(v) for v in order)
+
+
+def buffer_sort(buffer):
+	view = memoryview(buffer)
+	if view.readonly:
+		raise TypeError("cannot sort a read only buffer in place")
+	if not view.c_contiguous:
+		raise ValueError("cannot sort a non contiguous buffer in place")
+	if numpy is not None:
+		# a view on the same memory, sorted by numpy's typed kernel
+		numpy.asarray(view).reshape(-1).sort()
+		return
+	fmt = view.format
+	prefix = ""
+	if fmt[0] in "@=<>!":
+		prefix = fmt[0]
+		fmt = fmt[1:]
+	bytes_view = view.cast("B")
+	if fmt in ("B", "b", "c"):
+		_byte_counting_sort(bytes_view, fmt == "b")
+		return
+	values = sorted(struct.unpack("{}{}{}".format(prefix, len(bytes_view) // view.itemsize, fmt), bytes_view))
+	bytes_view[:] = struct.pack("{}{}{}".format(prefix, len(values), fmt), *values)
+
+
+def _buffer_typecode(array):
+	types = set(map(type, array))
+	if types == {float}:
+		return "d"
+	if types == {int} and -2 ** 63 <= min(array) and max(array) < 2 ** 63:
+		return "q"
+	return None
+
+
+def _sort_shared_bucket(task):
+	name, typecode, start, end = task
+	shm = shared_memory.SharedMemory(name = name)
+	try:
+		itemsize = struct.calcsize(typecode)
+		view = shm.buf[start * itemsize:end * itemsize].cast(typecode)
+		buffer_sort(view)
+		view.release()
+	finally:
+		shm.close()
+
+
+@_keyed_sort
+def sample_sort(array, workers = None, threshold = 100000, oversampling = 32):
+	length = len(array)
+	if workers is None:
+		workers = multiprocessing.cpu_count()
+	if workers < 2 or length < threshold:
+		pdq_sort(array)
+		return
+	typecode = _buffer_typecode(array)
+	if typecode is None:
+		# only primitive values can live in shared memory
+		parallel_merge_sort(array, workers, threshold)
+		return
+	sample = [array[i] for i in random.sample(range(length), min(length, workers * oversampling))]
+	pdq_sort(sample)
+	splitters = [sample[len(sample) * i // workers] for i in range(1, workers)]
+	itemsize = struct.calcsize(typecode)
+	shm = shared_memory.SharedMemory(create = True, size = length * itemsize)
+	shared = shm.buf[:length * itemsize].cast(typecode)
+	try:
+		if numpy is not None:
+			values = numpy.array(array, dtype = typecode)
+			buckets = numpy.searchsorted(numpy.array(splitters, dtype = typecode), values, side = "right")
+			sizes = numpy.bincount(buckets, minlength = workers).tolist()
+			bucketed = numpy.asarray(shared)
+			# bucket ids of 16 bits or less make the stable argsort a single radix pass instead of a comparison sort
+			buckets = buckets.astype(numpy.min_scalar_type(workers - 1))
+			bucketed[:] = values[numpy.argsort(buckets, kind = "stable")]
+			del bucketed
+		else:
+			buckets = [[] for i in range(workers)]
+			for v in array:
+				buckets[bisect.bisect_right(splitters, v)].append(v)
+			sizes = [len(bucket) for bucket in buckets]
+			start = 0
+			for bucket in buckets:
+				shared[start:start + len(bucket)] = typed_array(typecode, bucket)
+				start += len(bucket)
+		tasks = []
+		start = 0
+		for size in sizes:
+			if size > 1:
+				tasks.append((shm.name, typecode, start, start + size))
+			start += size
+		# the workers only receive the name and bounds of their bucket, the data never goes through pickle
+		with multiprocessing.Pool(min(workers, max(1, len(tasks)))) as pool:
+			pool.map(_sort_shared_bucket, tasks)
+		array[:] = shared.tolist()
+	finally:
+		shared.release()
+		shm.close()
+		shm.unlink()
+
+
+def lsd_bytes_sort(array):
+	n = len(array)
+	if n < 2:
+		return
+	width = len(array[0])
+	keys = array
+	aux = [None] * n
+	for index in range(width - 1, -1, -1):
+		count = [0] * 257
+		for b in keys:
+			count[b[index] + 1] += 1
+		if max(count) == n:
+			continue
+		for r in range(256):
+			count[r + 1] += count[r]
+		for b in keys:
+			d = b[index]
+			aux[count[d]] = b
+			count[d] += 1
+		keys, aux = aux, keys
+	if keys is not array:
+		array[:] = keys
+
+
+def msd_bytes_sort(array, cutoff = None):
+	aux = [None] * len(array)
+	_msd_bytes_sort_recursive(array, aux, 0, len(array), 0, _cutoff("msd_bytes_sort", cutoff))
+
+
+def _msd_bytes_sort_recursive(array, aux, low, high, index, cutoff):
+	if high - low < cutoff:
+		_range_insertion_sort(array, low, high)
+		return
+	# bucket 0 holds the keys that end before index
+	count = [0] * 258
+	for i in range(low, high):
+		b = array[i]
+		if index < len(b):
+			count[b[index] + 2] += 1
+		else:
+			count[1] += 1
+	for r in range(257):
+		count[r + 1] += count[r]
+	for i in range(low, high):
+		b = array[i]
+		if index < len(b):
+			d = b[index] + 1
+		else:
+			d = 0
+		aux[count[d]] = b
+		count[d] += 1
+	array[low:high] = aux[:high - low]
+	for d in range(1, 257):
+		start = count[d - 1]
+		end = count[d]
+		if end - start > 1:
+			_msd_bytes_sort_recursive(array, aux, low + start, low + end, index + 1, cutoff)
 
 
 class SortingTest:
@@ -535,18 +1874,207 @@ class ShellSortTest(unittest.TestCase, SortingTest):
 		return shell_sort
 
 
+class NetworkSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return network_sort
+
+	def test_networks(self):
+		# by the 0-1 principle a network sorts everything once it sorts every sequence of zeros and ones,
+		# bit b of word i holds element i of the b-th of those sequences so all of them run at once
+		for n in range(2, len(_NETWORK_SORTS)):
+			words = [0 for i in range(n)]
+			for pattern in range(1 << n):
+				for i in range(n):
+					if pattern >> i & 1:
+						words[i] |= 1 << pattern
+			for i, j in _merge_exchange_network(n):
+				words[i], words[j] = words[i] & words[j], words[i] | words[j]
+			for i in range(n - 1):
+				self.assertEqual(0, words[i] & ~words[i + 1], "Network for {} elements does not sort".format(n))
+
+	def test_small(self):
+		for n in range(20):
+			for i in range(50):
+				to_sort = [random.randint(0, 5) for j in range(n)]
+				expected = sorted(to_sort)
+				network_sort(to_sort)
+				self.assertEqual(expected, to_sort)
+		to_sort = random_array(100)
+		expected = sorted(to_sort)
+		to_sort = [-x for x in to_sort]
+		network_sort(to_sort, key = lambda x: -x)
+		self.assertEqual(expected, [-x for x in to_sort])
+
+
+class CutoffTest(unittest.TestCase):
+
+	def test_cutoff(self):
+		for name in CUTOFFS:
+			data = _tuning_input(name, random.Random(0), 3000)
+			for cutoff in (4, 7, 40):
+				to_sort = list(data)
+				_tuning_sorter(name)(to_sort, cutoff = cutoff)
+				self.assertEqual(sorted(data), to_sort, "{} failed with cutoff {}".format(name, cutoff))
+		with self.assertRaises(ValueError):
+			quick_sort(random_array(100), cutoff = 1)
+
+	def test_tune(self):
+		with mock.patch.dict(CUTOFFS):
+			names = ["quick_sort", "pdq_sort", "quick3_string_sort", "msd_string_sort", "msd_bytes_sort"]
+			tuned = tune_cutoffs(names, candidates = (8, 16), size = 300, repetitions = 1)
+			for name in names:
+				self.assertIn(tuned[name], (8, 16))
+			self.assertEqual(tuned, CUTOFFS)
+
+	def test_auto_tune(self):
+		with mock.patch.dict(CUTOFFS), mock.patch(__name__ + ".AUTO_TUNE", True), \
+				mock.patch(__name__ + "._tuned", False), mock.patch(__name__ + ".tune_cutoffs") as tune:
+			quick_sort(random_array(100))
+			quick_sort(random_array(100))
+			tune.assert_called_once_with()
+
+
 class MergeSortTest(unittest.TestCase, SortingTest):
 
 	def get_sorter(self):
 		return merge_sort
 
 
+class InPlaceMergeSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return functools.partial(merge_sort, in_place = True)
+
+	def test_stable(self):
+		records = [(v, i) for i, v in enumerate(random_array(10000, 0, 50))]
+		expected = sorted(records, key = lambda t: t[0])
+		for sorter in (merge_sort, natural_merge_sort):
+			to_sort = [KeyedRecord(v[0], v) for v in records]
+			sorter(to_sort, in_place = True)
+			self.assertEqual(expected, [k.record for k in to_sort], "In place merge is not stable")
+
+	def test_key_rejected(self):
+		for sorter in (merge_sort, natural_merge_sort):
+			with self.assertRaises(ValueError):
+				sorter([2, 1], in_place = True, key = abs)
+			with self.assertRaises(ValueError):
+				sorter([1, 2], in_place = True, reverse = True)
+
+
+class ParallelMergeSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return functools.partial(parallel_merge_sort, workers = 3, threshold = 1000)
+
+	def test_tiny(self):
+		for to_sort in ([], [1]):
+			expected = list(to_sort)
+			parallel_merge_sort(to_sort, workers = 2, threshold = 0)
+			self.assertEqual(expected, to_sort)
+
+
+class MergeSortedTest(unittest.TestCase):
+
+	def test_merge(self):
+		sources = [sorted(random_array(n, 0, 100)) for n in (0, 1, 10, 100, 1000)]
+		expected = sorted(v for source in sources for v in source)
+		self.assertEqual(expected, list(merge_sorted(*[iter(source) for source in sources])))
+		self.assertEqual(sorted(set(expected)), list(merge_sorted(*sources, unique = True)))
+		records = [sorted([(v, n) for v in random_array(n, 0, 100)], key = lambda t: -t[0]) for n in (5, 50, 500)]
+		expected = sorted([r for source in records for r in source], key = lambda t: t[0], reverse = True)
+		self.assertEqual(expected, list(merge_sorted(*records, key = lambda t: t[0], reverse = True)))
+
+	def test_lazy(self):
+		def multiples(k):
+			i = 0
+			while True:
+				yield i
+				i += k
+
+		merged = merge_sorted(multiples(2), multiples(3), unique = True)
+		self.assertEqual([0, 2, 3, 4, 6, 8, 9, 10], [next(merged) for i in range(8)])
+
+
+class ExternalSortTest(unittest.TestCase):
+
+	def test_sort(self):
+		n = 10000
+		records = [(v, i) for i, v in enumerate(random_array(n))]
+		result = list(external_sort(iter(records), memory_limit = 4096, key = lambda t: t[0], reverse = True))
+		self.assertEqual(sorted(records, key = lambda t: t[0], reverse = True), result)
+
+	def test_sort_file(self):
+		lines = ["{}\n".format(v) for v in random_array(5000)]
+		with tempfile.NamedTemporaryFile("w", delete = False) as f:
+			f.writelines(lines)
+		try:
+			self.assertEqual(sorted(lines), list(external_sort(f.name, memory_limit = 8192)))
+		finally:
+			os.remove(f.name)
+
+	def test_merge_passes(self):
+		records = [(v / 7, i) for i, v in enumerate(random_array(6000))]
+		open_runs = [0, 0]
+		read_run = _read_run
+
+		def counting_read_run(path):
+			open_runs[0] += 1
+			open_runs[1] = max(open_runs)
+			try:
+				yield from read_run(path)
+			finally:
+				open_runs[0] -= 1
+
+		temp_dir = tempfile.mkdtemp()
+		try:
+			with mock.patch(__name__ + "._read_run", counting_read_run):
+				result = list(external_sort(iter(records), memory_limit = 2000, key = lambda t: t[0], temp_dir = temp_dir,
+				                            fan_in = 4))
+			self.assertEqual(sorted(records, key = lambda t: t[0]), result)
+			self.assertEqual(4, open_runs[1])
+			self.assertEqual([], os.listdir(temp_dir))
+		finally:
+			os.rmdir(temp_dir)
+		with self.assertRaises(ValueError):
+			list(external_sort([1], fan_in = 1))
+
+
 class NaturalMergeSortTest(unittest.TestCase, SortingTest):
 
 	def get_sorter(self):
 		return natural_merge_sort
 
 
+class TimSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return tim_sort
+
+	def test_runs(self):
+		n = 10000
+		to_sort = []
+		for i in range(20):
+			run = sorted(random_array(n // 20 + i, 0, 50))
+			if i % 2 == 1:
+				run.reverse()
+			to_sort.extend((v, len(to_sort) + j) for j, v in enumerate(run))
+		expected = sorted(to_sort, key = lambda t: t[0])
+		keys = [KeyedRecord(v[0], v) for v in to_sort]
+		tim_sort(keys)
+		self.assertEqual(expected, [k.record for k in keys], "Tim sort is not stable across runs")
+
+
+class KeyedRecord:
+
+	def __init__(self, key, record):
+		self.key = key
+		self.record = record
+
+	def __lt__(self, other):
+		return self.key < other.key
+
+
 class QuickSortTest(unittest.TestCase, SortingTest):
 
 	def get_sorter(self):
@@ -558,6 +2086,28 @@ class IterativeQuickSortTest(unittest.TestCase, SortingTest):
 	def get_sorter(self):
 		return iterative_quick_sort
 
+	def test_depth_limit(self):
+		# always pivoting on the first element is quadratic on sorted input unless the heap sort fallback kicks in
+		for three_way in (False, True):
+			to_sort = list(range(5000))
+			with mock.patch(__name__ + "._choose_pivot", lambda array, low, high: low), \
+					mock.patch(__name__ + "._range_heap_sort", wraps = _range_heap_sort) as fallback:
+				iterative_quick_sort(to_sort, three_way = three_way)
+			self.assertTrue(fallback.called)
+			self.assertEqual(list(range(5000)), to_sort)
+
+
+class ThreewayIterativeQuickSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return functools.partial(iterative_quick_sort, three_way = True)
+
+	def test_duplicates(self):
+		to_sort = random_array(10000, 0, 3)
+		expected = sorted(to_sort)
+		iterative_quick_sort(to_sort, three_way = True)
+		self.assertEqual(expected, to_sort)
+
 
 class SamplingQuickSortTest(unittest.TestCase, SortingTest):
 
@@ -571,11 +2121,62 @@ class ThreewayQuickSortTest(unittest.TestCase, SortingTest):
 		return threeway_quick_sort
 
 
+class PDQSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return pdq_sort
+
+	def test_patterns(self):
+		n = 10000
+		ascending = list(range(n))
+		patterns = [ascending, ascending[::-1], [7] * n, ascending[:n // 2] + ascending[n // 2:0:-1],
+		            [i % 100 for i in range(n)], random_array(n, 0, 3)]
+		for pattern in patterns:
+			to_sort = list(pattern)
+			pdq_sort(to_sort)
+			self.assertEqual(sorted(pattern), to_sort)
+
+	def test_block_partition(self):
+		for n in (2, 17, 200, 1000):
+			to_sort = random_array(n, 0, 50)
+			pivot = to_sort[0]
+			pivot_pos, already_partitioned = _block_partition(to_sort, 0, n)
+			self.assertEqual(pivot, to_sort[pivot_pos])
+			self.assertTrue(all(v < pivot for v in to_sort[:pivot_pos]))
+			self.assertTrue(all(not v < pivot for v in to_sort[pivot_pos:]))
+
+
+class IntroSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return intro_sort
+
+	def test_patterns(self):
+		n = 10000
+		ascending = list(range(n))
+		patterns = [ascending, ascending[::-1], [7] * n, ascending[:n // 2] + ascending[n // 2:0:-1]]
+		for pattern in patterns:
+			to_sort = list(pattern)
+			intro_sort(to_sort)
+			self.assertEqual(sorted(pattern), to_sort)
+		to_sort = random_array(n)
+		_intro_sort_recursive(to_sort, 0, n, 1, 16)
+		self.assertEqual(sorted(to_sort), to_sort, "Heap sort fallback failed to put everything in order")
+
+
 class HeapSortTest(unittest.TestCase, SortingTest):
 
 	def get_sorter(self):
 		return heap_sort
 
+	def test_tiny(self):
+		for to_sort in ([], [1], [2, 1]):
+			expected = sorted(to_sort)
+			heap_sort(to_sort)
+			self.assertEqual(expected, to_sort)
+			heap_sort(to_sort, key = lambda x: -x)
+			self.assertEqual(expected[::-1], to_sort)
+
 
 class SystemSortTest(unittest.TestCase, SortingTest):
 
@@ -583,6 +2184,28 @@ class SystemSortTest(unittest.TestCase, SortingTest):
 		return list.sort
 
 
+class KeyedSortTest(unittest.TestCase):
+
+	def test_key_and_reverse(self):
+		n = 2000
+		records = [(v, str(i)) for i, v in enumerate(random_array(n, 0, 100))]
+		sorters = [selection_sort, insertion_sort, shell_sort, merge_sort, natural_merge_sort, tim_sort, quick_sort,
+		           iterative_quick_sort, sampling_quick_sort, threeway_quick_sort, intro_sort, pdq_sort, heap_sort,
+		           functools.partial(parallel_merge_sort, workers = 2, threshold = 100)]
+		for sorter in sorters:
+			for reverse in (False, True):
+				to_sort = list(records)
+				sorter(to_sort, key = lambda t: t[0], reverse = reverse)
+				self.assertEqual(sorted(records, key = lambda t: t[0], reverse = reverse), to_sort, repr(sorter))
+
+	def test_key_computed_once(self):
+		calls = []
+		to_sort = random_array(1000)
+		merge_sort(to_sort, key = lambda v: calls.append(v) or -v)
+		self.assertEqual(1000, len(calls))
+		self.assertEqual(sorted(to_sort, reverse = True), to_sort)
+
+
 class MedianTest(unittest.TestCase):
 
 	def test_select(self):
@@ -595,6 +2218,33 @@ class MedianTest(unittest.TestCase):
 		self.assertEqual(supposed_median, real_median)
 
 
+class PartialOrderTest(unittest.TestCase):
+
+	def test_nth_element(self):
+		n = 10000
+		expected = sorted(random_array(n))
+		for k in (0, n // 2, n * 99 // 100, n - 1):
+			to_sort = random_array(n)
+			self.assertEqual(expected[k], nth_element(to_sort, k))
+			self.assertTrue(max(to_sort[:k], default = to_sort[k]) <= to_sort[k] <= min(to_sort[k:]))
+		to_sort = random_array(n)
+		_select_range(to_sort, 0, n, n // 3, 0)
+		self.assertEqual(expected[n // 3], to_sort[n // 3], "Median of medians failed to select the kth element")
+
+	def test_partial_sort(self):
+		n = 10000
+		to_sort = random_array(n)
+		expected = sorted(to_sort)
+		partial_sort(to_sort, 100)
+		self.assertEqual(expected[:100], to_sort[:100])
+		self.assertEqual(expected, sorted(to_sort))
+
+	def test_top_k(self):
+		records = [(v, i) for i, v in enumerate(random_array(10000))]
+		expected = sorted(records, key = lambda t: t[0], reverse = True)[:100]
+		self.assertEqual(expected, top_k(iter(records), 100, key = lambda t: t[0]))
+
+
 class InversionTest(unittest.TestCase):
 
 	def test_inversions(self):
@@ -602,6 +2252,120 @@ class InversionTest(unittest.TestCase):
 		to_sort = random_array(n, 0, 1000)
 		self.assertEqual(naive_inversions(to_sort), inversions(to_sort))
 
+	def test_fenwick_inversions(self):
+		n = 3000
+		to_sort = [str(v) for v in random_array(n, 0, 1000)]
+		self.assertEqual(naive_inversions(to_sort), fenwick_inversions(to_sort))
+
+	def test_parallel_inversions(self):
+		n = 3000
+		to_sort = random_array(n, 0, 1000)
+		expected = naive_inversions(to_sort)
+		for workers in (2, 5):
+			self.assertEqual(expected, parallel_inversions(to_sort, workers = workers, threshold = 100))
+		self.assertEqual(0, parallel_inversions([], workers = 2, threshold = 0))
+		self.assertEqual(0, parallel_inversions([1], workers = 2, threshold = 0))
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class NumpyFastPathTest(unittest.TestCase):
+
+	def test_fast_path(self):
+		n = 10000
+		for to_sort in (random_array(n), [v / 7 for v in random_array(n)]):
+			with mock.patch(__name__ + ".numpy", None):
+				expected_inversions = inversions(to_sort)
+			self.assertEqual(expected_inversions, inversions(to_sort))
+			self.assertEqual(sorted(to_sort)[n // 3], select(list(to_sort), n // 3))
+			for sorter in (merge_sort, heap_sort):
+				result = list(to_sort)
+				sorter(result)
+				self.assertEqual(sorted(to_sort), result)
+				self.assertTrue(all(type(v) is type(to_sort[0]) for v in result))
+
+
+class RadixSortTest(unittest.TestCase):
+
+	def test_integers(self):
+		for low, high in ((0, 1000), (-2 ** 40, 2 ** 40)):
+			for digit_bits in (8, 16):
+				to_sort = random_array(10000, low, high)
+				expected = sorted(to_sort)
+				lsd_integer_sort(to_sort, digit_bits)
+				self.assertEqual(expected, to_sort)
+
+	def test_floats(self):
+		to_sort = [v / 3 for v in random_array(10000, -10 ** 6, 10 ** 6)] + [0.0, -0.0, float("inf"), float("-inf")]
+		expected = sorted(to_sort)
+		lsd_float_sort(to_sort)
+		self.assertEqual(expected, to_sort)
+
+	def test_bytes(self):
+		fixed = [v.to_bytes(4, "big") for v in random_array(10000, 0, 2 ** 32 - 1)]
+		expected = sorted(fixed)
+		lsd_bytes_sort(fixed)
+		self.assertEqual(expected, fixed)
+		variable = [bytes(random_array(i, 0, 3)) for i in random_array(10000, 0, 12)]
+		expected = sorted(variable)
+		msd_bytes_sort(variable)
+		self.assertEqual(expected, variable)
+
+
+class SampleSortTest(unittest.TestCase, SortingTest):
+
+	def get_sorter(self):
+		return functools.partial(sample_sort, workers = 3, threshold = 1000)
+
+	def check_types(self):
+		for to_sort in ([v / 7 for v in random_array(5000, -1000, 1000)], [str(v) for v in random_array(5000)],
+		                random_array(5000, 0, 2)):
+			expected = sorted(to_sort)
+			sample_sort(to_sort, workers = 4, threshold = 1000)
+			self.assertEqual(expected, to_sort)
+
+	def test_types(self):
+		self.check_types()
+
+	def test_types_without_numpy(self):
+		with mock.patch(__name__ + ".numpy", None):
+			self.check_types()
+
+	def test_key(self):
+		to_sort = random_array(5000)
+		expected = sorted(to_sort, key = lambda v: v % 10, reverse = True)
+		sample_sort(to_sort, workers = 3, threshold = 1000, key = lambda v: v % 10, reverse = True)
+		self.assertEqual(expected, to_sort)
+
+
+class BufferSortTest(unittest.TestCase):
+
+	def check_buffers(self):
+		doubles = typed_array("d", [v / 3 for v in random_array(10000, -1000, 1000)])
+		expected = sorted(doubles)
+		buffer_sort(doubles)
+		self.assertEqual(expected, doubles.tolist())
+		longs = typed_array("q", random_array(10000, -2 ** 40, 2 ** 40))
+		expected = sorted(longs[100:200])
+		buffer_sort(memoryview(longs)[100:200])
+		self.assertEqual(expected, longs[100:200].tolist())
+		for code in ("b", "B"):
+			small = typed_array(code, random_array(10000, -128 if code == "b" else 0, 127))
+			expected = sorted(small)
+			buffer_sort(small)
+			self.assertEqual(expected, small.tolist())
+		data = bytearray(random_array(10000, 0, 255))
+		expected = bytearray(sorted(data))
+		buffer_sort(data)
+		self.assertEqual(expected, data)
+		self.assertRaises(TypeError, buffer_sort, bytes(data))
+
+	def test_sort(self):
+		self.check_buffers()
+
+	def test_sort_without_numpy(self):
+		with mock.patch(__name__ + ".numpy", None):
+			self.check_buffers()
+
 
 class TypeCountSortTest(unittest.TestCase):
 
@@ -649,5 +2413,24 @@ class MSDStringSortTest(unittest.TestCase):
 			self.assertTrue(strings[i] >= strings[i - 1], "Sorting algorithm failed to put everything in order")
 
 
-if __name__ == "__main__":
-	doubling_test(threeway_quick_sort, sample_size = 1)
+class Quick3StringSortTest(unittest.TestCase):
+
+	def test_sort(self):
+		n = 10000
+		prefixes = ["https://example.com/", "https://example.com/a/", "http://b.org/", ""]
+		strings = []
+		for i in range(n):
+			s = [prefixes[random.randint(0, len(prefixes) - 1)]]
+			for j in range(random.randint(0, 8)):
+				s.append(string.ascii_lowercase[random.randint(0, 3)])
+			strings.append("".join(s))
+		expected = sorted(strings)
+		quick3_string_sort(strings)
+		self.assertEqual(expected, strings)
+
+	def test_multi_column_key(self):
+		records = [(v % 7, str(v % 13), v) for v in random_array(10000, 0, 10 ** 6)]
+		expected = sorted(records, key = lambda t: (t[0], t[1]))
+		quick3_string_sort(records, key = lambda t: (t[0], t[1]))
+		self.assertEqual([(t[0], t[1]) for t in expected], [(t[0], t[1]) for t in records])
+		self.assertEqual(sorted(expected), sorted(records))
@@ -0,0 +1,301 @@
+import argparse
+import csv
+import io
+import json
+import math
+import random
+import statistics
+import string
+import sys
+import time
+import unittest
+
+from algorithms import sort
+
+
+def _msd_string_sort(array):
+	# the charset order is the sort order, so the letters are passed in code point order like the other sorters compare them
+	sort.msd_string_sort(array, string.ascii_uppercase + string.ascii_lowercase)
+
+
+# the benchmark sizes are far below the default thresholds, without these wrappers both would fall back to a
+# serial sort and the process pool would never be measured
+def _parallel_merge_sort(array):
+	sort.parallel_merge_sort(array, threshold = 0)
+
+
+def _sample_sort(array):
+	sort.sample_sort(array, threshold = 0)
+
+
+SORTERS = {
+	"merge_sort": sort.merge_sort,
+	"natural_merge_sort": sort.natural_merge_sort,
+	"tim_sort": sort.tim_sort,
+	"quick_sort": sort.quick_sort,
+	"iterative_quick_sort": sort.iterative_quick_sort,
+	"sampling_quick_sort": sort.sampling_quick_sort,
+	"threeway_quick_sort": sort.threeway_quick_sort,
+	"intro_sort": sort.intro_sort,
+	"pdq_sort": sort.pdq_sort,
+	"heap_sort": sort.heap_sort,
+	"shell_sort": sort.shell_sort,
+	"lsd_integer_sort": sort.lsd_integer_sort,
+	"msd_string_sort": _msd_string_sort,
+	"quick3_string_sort": sort.quick3_string_sort,
+	"parallel_merge_sort": _parallel_merge_sort,
+	"sample_sort": _sample_sort,
+	"system_sort": list.sort,
+}
+
+# distributions holding elements a sorter cannot handle, e.g. a radix sort on strings
+UNSUPPORTED = {
+	"lsd_integer_sort": ("strings",),
+	"msd_string_sort": ("random", "sorted", "reversed", "few_unique", "organ_pipe"),
+	"quick3_string_sort": ("random", "sorted", "reversed", "few_unique", "organ_pipe"),
+}
+
+SIZES = (1000, 2000, 4000, 8000, 16000)
+
+CSV_FIELDS = ("algorithm", "distribution", "size", "median", "iqr", "min", "repetitions")
+
+EXPONENT_FIELDS = ("algorithm", "distribution", "exponent")
+
+
+def _random_input(n, rng):
+	return [rng.randint(0, n) for i in range(n)]
+
+
+def _sorted_input(n, rng):
+	return sorted(_random_input(n, rng))
+
+
+def _reversed_input(n, rng):
+	return sorted(_random_input(n, rng), reverse = True)
+
+
+def _few_unique_input(n, rng):
+	return [rng.randint(0, 7) for i in range(n)]
+
+
+def _organ_pipe_input(n, rng):
+	half = n // 2
+	return list(range(half)) + list(range(n - half, 0, -1))
+
+
+def _string_input(n, rng):
+	letters = string.ascii_letters
+	return ["".join(rng.choice(letters) for j in range(rng.randint(1, 16))) for i in range(n)]
+
+
+DISTRIBUTIONS = {
+	"random": _random_input,
+	"sorted": _sorted_input,
+	"reversed": _reversed_input,
+	"few_unique": _few_unique_input,
+	"organ_pipe": _organ_pipe_input,
+	"strings": _string_input,
+}
+
+
+def _time_sorter(sorter, data, repetitions, warmup):
+	expected = sorted(data)
+	timings = []
+	for i in range(warmup + repetitions):
+		# every repetition sorts a fresh copy so no run sees already sorted input
+		to_sort = list(data)
+		start = time.perf_counter()
+		sorter(to_sort)
+		elapsed = time.perf_counter() - start
+		if to_sort != expected:
+			raise AssertionError("{} failed to put everything in order".format(sorter.__name__))
+		if i >= warmup:
+			timings.append(elapsed)
+	return timings
+
+
+def run_benchmark(sorters = None, distributions = None, sizes = SIZES, repetitions = 5, warmup = 1, seed = 0):
+	if sorters is None:
+		sorters = SORTERS
+	if distributions is None:
+		distributions = DISTRIBUTIONS
+	results = []
+	for distribution, generator in distributions.items():
+		for size in sizes:
+			data = generator(size, random.Random(seed + size))
+			for algorithm, sorter in sorters.items():
+				if distribution in UNSUPPORTED.get(algorithm, ()):
+					continue
+				timings = _time_sorter(sorter, data, repetitions, warmup)
+				if len(timings) > 1:
+					quartiles = statistics.quantiles(timings, n = 4)
+					iqr = quartiles[2] - quartiles[0]
+				else:
+					iqr = 0.0
+				results.append({
+					"algorithm": algorithm,
+					"distribution": distribution,
+					"size": size,
+					"median": statistics.median(timings),
+					"iqr": iqr,
+					"min": min(timings),
+					"repetitions": repetitions,
+				})
+	return results
+
+
+def growth_exponents(results):
+	points = {}
+	for result in results:
+		if result["median"] > 0:
+			case = (result["algorithm"], result["distribution"])
+			points.setdefault(case, []).append((math.log(result["size"]), math.log(result["median"])))
+	exponents = {}
+	for case, xy in points.items():
+		if len(xy) < 2:
+			continue
+		# least squares slope of log(time) against log(size)
+		mean_x = sum(x for x, y in xy) / len(xy)
+		mean_y = sum(y for x, y in xy) / len(xy)
+		variance = sum((x - mean_x) ** 2 for x, y in xy)
+		if variance == 0:
+			continue
+		exponents[case] = sum((x - mean_x) * (y - mean_y) for x, y in xy) / variance
+	return exponents
+
+
+def compare_to_baseline(results, baseline, tolerance = 0.1):
+	previous = {}
+	for result in baseline:
+		previous[(result["algorithm"], result["distribution"], result["size"])] = result["median"]
+	regressions = []
+	for result in results:
+		case = (result["algorithm"], result["distribution"], result["size"])
+		if case in previous and result["median"] > previous[case] * (1 + tolerance):
+			regressions.append({
+				"algorithm": result["algorithm"],
+				"distribution": result["distribution"],
+				"size": result["size"],
+				"baseline": previous[case],
+				"median": result["median"],
+				"ratio": result["median"] / previous[case],
+			})
+	return regressions
+
+
+def _exponent_rows(results):
+	exponents = []
+	for (algorithm, distribution), exponent in sorted(growth_exponents(results).items()):
+		exponents.append({"algorithm": algorithm, "distribution": distribution, "exponent": exponent})
+	return exponents
+
+
+def write_json(results, f):
+	json.dump({"results": results, "growth_exponents": _exponent_rows(results)}, f, indent = 2)
+
+
+def write_csv(results, f):
+	writer = csv.DictWriter(f, CSV_FIELDS)
+	writer.writeheader()
+	for result in results:
+		writer.writerow(result)
+	# the fitted exponents follow as a second table after a blank line
+	csv.writer(f).writerow([])
+	writer = csv.DictWriter(f, EXPONENT_FIELDS)
+	writer.writeheader()
+	for exponent in _exponent_rows(results):
+		writer.writerow(exponent)
+
+
+def load_results(f):
+	return json.load(f)["results"]
+
+
+def main(argv = None):
+	parser = argparse.ArgumentParser(description = "Benchmark the sorting algorithms across input distributions")
+	parser.add_argument("--algorithms", nargs = "+", choices = sorted(SORTERS), default = sorted(SORTERS))
+	parser.add_argument("--distributions", nargs = "+", choices = sorted(DISTRIBUTIONS), default = sorted(DISTRIBUTIONS))
+	parser.add_argument("--sizes", nargs = "+", type = int, default = list(SIZES))
+	parser.add_argument("--repetitions", type = int, default = 5)
+	parser.add_argument("--warmup", type = int, default = 1)
+	parser.add_argument("--seed", type = int, default = 0)
+	parser.add_argument("--format", choices = ("json", "csv"), default = "json")
+	parser.add_argument("--output", help = "file to write the results to, standard output by default")
+	parser.add_argument("--baseline", help = "json results of a previous run to compare against")
+	parser.add_argument("--tolerance", type = float, default = 0.1)
+	args = parser.parse_args(argv)
+
+	sorters = {name: SORTERS[name] for name in args.algorithms}
+	distributions = {name: DISTRIBUTIONS[name] for name in args.distributions}
+	results = run_benchmark(sorters, distributions, args.sizes, args.repetitions, args.warmup, args.seed)
+	writer = write_json if args.format == "json" else write_csv
+	if args.output is None:
+		writer(results, sys.stdout)
+	else:
+		with open(args.output, "w", newline = "") as f:
+			writer(results, f)
+	if args.baseline is None:
+		return 0
+	with open(args.baseline) as f:
+		regressions = compare_to_baseline(results, load_results(f), args.tolerance)
+	for regression in regressions:
+		print("Regression: {algorithm} on {distribution} of size {size} took {median:.6f}s, "
+		      "{ratio:.2f} times the baseline {baseline:.6f}s".format(**regression), file = sys.stderr)
+	return 1 if regressions else 0
+
+
+class BenchmarkTest(unittest.TestCase):
+
+	def test_benchmark(self):
+		sorters = {"tim_sort": sort.tim_sort, "lsd_integer_sort": sort.lsd_integer_sort}
+		results = run_benchmark(sorters, sizes = (100, 200, 400), repetitions = 3)
+		self.assertEqual(len(DISTRIBUTIONS) * 3 * 2 - 3, len(results))
+		for result in results:
+			self.assertTrue(result["min"] <= result["median"])
+			self.assertTrue(result["iqr"] >= 0)
+		self.assertEqual(len(DISTRIBUTIONS) * 2 - 1, len(growth_exponents(results)))
+
+	def test_registered_sorters(self):
+		results = run_benchmark(sizes = (50, 100), repetitions = 1, warmup = 0)
+		algorithms = {result["algorithm"] for result in results}
+		self.assertEqual(set(SORTERS), algorithms)
+		for algorithm in ("msd_string_sort", "quick3_string_sort"):
+			self.assertEqual({"strings"}, {r["distribution"] for r in results if r["algorithm"] == algorithm})
+
+	def test_write_csv(self):
+		results = []
+		for size in (1000, 2000):
+			results.append({"algorithm": "a", "distribution": "d", "size": size, "median": size * 1e-9, "iqr": 0.0,
+			                "min": size * 1e-9, "repetitions": 1})
+		f = io.StringIO()
+		write_csv(results, f)
+		rows, exponents = f.getvalue().split("\r\n\r\n")
+		self.assertEqual(3, len(rows.splitlines()))
+		header, row = csv.reader(io.StringIO(exponents))
+		self.assertEqual(list(EXPONENT_FIELDS), header)
+		self.assertEqual(["a", "d"], row[:2])
+		self.assertAlmostEqual(1.0, float(row[2]))
+
+	def test_failures_propagate(self):
+		def broken_sort(array):
+			raise TypeError("broken")
+
+		with self.assertRaises(TypeError):
+			run_benchmark({"broken_sort": broken_sort}, sizes = (10,), repetitions = 1)
+
+	def test_growth_exponents(self):
+		results = []
+		for size in (1000, 2000, 4000):
+			results.append({"algorithm": "a", "distribution": "d", "size": size, "median": size ** 2 * 1e-9})
+		self.assertAlmostEqual(2.0, growth_exponents(results)[("a", "d")])
+
+	def test_compare_to_baseline(self):
+		baseline = [{"algorithm": "a", "distribution": "d", "size": 10, "median": 1.0}]
+		self.assertEqual([], compare_to_baseline([dict(baseline[0], median = 1.05)], baseline))
+		regressions = compare_to_baseline([dict(baseline[0], median = 2.0)], baseline)
+		self.assertEqual(1, len(regressions))
+		self.assertEqual(2.0, regressions[0]["ratio"])
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,169 @@
+import array
+import bisect
+import random
+import unittest
+
+from algorithms.binarySearch import first_occur_binary_search
+
+
+def _storage(values):
+	# homogeneous ints and floats are packed into a contiguous array instead of a list of pointers to boxed numbers
+	types = set(map(type, values))
+	if types == {int}:
+		try:
+			return array.array("q", values)
+		except OverflowError:
+			pass
+	elif types == {float}:
+		return array.array("d", values)
+	return list(values)
+
+
+class _StaticIndex:
+
+	def __init__(self, sorted_sequence):
+		for i in range(1, len(sorted_sequence)):
+			if sorted_sequence[i] < sorted_sequence[i - 1]:
+				raise ValueError("sequence must be sorted")
+		self._size = len(sorted_sequence)
+
+	def __contains__(self, key):
+		return self.search(key)[0] != -1
+
+	def __len__(self):
+		return self._size
+
+
+class EytzingerIndex(_StaticIndex):
+
+	def __init__(self, sorted_sequence):
+		super().__init__(sorted_sequence)
+		n = self._size
+		# node k has its children at 2k and 2k + 1, so the first levels of every search share the same few cache lines
+		rank = [0 for i in range(n + 1)]
+		stack = []
+		k = 1
+		i = 0
+		while stack or k <= n:
+			while k <= n:
+				stack.append(k)
+				k = 2 * k
+			k = stack.pop()
+			rank[k] = i
+			i += 1
+			k = 2 * k + 1
+		layout = [sorted_sequence[rank[k]] for k in range(1, n + 1)]
+		layout.insert(0, layout[0] if n > 0 else 0)
+		# the layout is the only copy of the keys, the ranks map it back to positions in the sorted sequence
+		self._layout = _storage(layout)
+		self._rank = array.array("i" if n < 1 << 31 else "q", rank)
+
+	def _node(self, key):
+		layout = self._layout
+		n = self._size
+		k = 1
+		while k <= n:
+			k = 2 * k + (layout[k] < key)
+		# the answer is the node where the descent last went left, undo the right turns after it and that left turn
+		return k >> (~k & (k + 1)).bit_length()
+
+	def lower_bound(self, key):
+		k = self._node(key)
+		if k == 0:
+			return self._size
+		return self._rank[k]
+
+	def search(self, key):
+		k = self._node(key)
+		if k != 0 and not key < self._layout[k]:
+			return self._rank[k], self._layout[k]
+		return -1, None
+
+
+class StaticBTree(_StaticIndex):
+
+	def __init__(self, sorted_sequence, block_size = 64):
+		super().__init__(sorted_sequence)
+		self._keys = _storage(sorted_sequence)
+		if block_size < 2:
+			raise ValueError("block_size must be at least 2")
+		self._block_size = block_size
+		# every level keeps the largest key of each block of the level below, stored top level first in one array
+		levels = []
+		level = self._keys
+		while len(level) > block_size:
+			level = [level[min(i + block_size, len(level)) - 1] for i in range(0, len(level), block_size)]
+			levels.append(level)
+		levels.reverse()
+		self._offsets = []
+		tree = []
+		for level in levels:
+			self._offsets.append((len(tree), len(level)))
+			tree.extend(level)
+		self._tree = _storage(tree)
+
+	def lower_bound(self, key):
+		block_size = self._block_size
+		tree = self._tree
+		node = 0
+		for offset, length in self._offsets:
+			low = offset + node * block_size
+			high = min(low + block_size, offset + length)
+			node = bisect.bisect_left(tree, key, low, high) - offset
+			if node == length:
+				return len(self._keys)
+		low = node * block_size
+		return bisect.bisect_left(self._keys, key, low, min(low + block_size, len(self._keys)))
+
+	def search(self, key):
+		index = self.lower_bound(key)
+		if index < self._size and not key < self._keys[index]:
+			return index, self._keys[index]
+		return -1, None
+
+
+class StaticIndexTest(unittest.TestCase):
+
+	@staticmethod
+	def numeric_comparator(a, b):
+		if a > b:
+			return -1
+		if a < b:
+			return 1
+		return 0
+
+	def indexes(self, sorted_sequence):
+		return [EytzingerIndex(sorted_sequence), StaticBTree(sorted_sequence), StaticBTree(sorted_sequence, 2),
+		        StaticBTree(sorted_sequence, 5)]
+
+	def check(self, sorted_sequence, keys):
+		for index in self.indexes(sorted_sequence):
+			self.assertEqual(len(sorted_sequence), len(index))
+			for key in keys:
+				self.assertEqual(bisect.bisect_left(sorted_sequence, key), index.lower_bound(key))
+				expected = first_occur_binary_search(sorted_sequence, key, StaticIndexTest.numeric_comparator)
+				self.assertEqual(expected, index.search(key))
+				self.assertEqual(key in sorted_sequence, key in index)
+
+	def test_lookup(self):
+		random.seed(3)
+		for n in (0, 1, 2, 7, 64, 65, 1000):
+			sorted_sequence = sorted(random.randint(0, 2 * n) for i in range(n))
+			self.check(sorted_sequence, range(-1, 2 * n + 2))
+		prices = sorted(random.random() * 100 for i in range(500))
+		self.check(prices, prices[::7] + [-1.0, 50.0, 101.0])
+		words = sorted("".join(random.choice("abcd") for j in range(3)) for i in range(200))
+		self.check(words, ["", "a", "abc", "bb", "dddd", "e"] + words[::9])
+
+	def test_storage(self):
+		self.assertIsInstance(EytzingerIndex([1, 2, 3])._layout, array.array)
+		self.assertIsInstance(StaticBTree([0.5] * 100, 4)._tree, array.array)
+		self.assertIsInstance(EytzingerIndex(["a", "b"])._layout, list)
+		self.assertFalse(hasattr(EytzingerIndex([1, 2, 3]), "_keys"))
+		self.assertEqual((1, 2 ** 70), EytzingerIndex([1, 2 ** 70]).search(2 ** 70))
+
+	def test_unsorted(self):
+		with self.assertRaises(ValueError):
+			EytzingerIndex([2, 1])
+		with self.assertRaises(ValueError):
+			StaticBTree([1, 2, 3], 1)
@@ -0,0 +1,179 @@
+import random
+import unittest
+
+from algorithms.sort import random_array
+from algorithms.sort import tim_sort
+from algorithms.sort import type_counting_sort
+
+
+def _counting_sort_by_rank(order, rank, max_rank):
+	count = [0 for i in range(max_rank + 2)]
+	for i in order:
+		count[rank[i] + 1] += 1
+	for r in range(max_rank + 1):
+		count[r + 1] += count[r]
+	result = [0 for i in range(len(order))]
+	for i in order:
+		result[count[rank[i]]] = i
+		count[rank[i]] += 1
+	return result
+
+
+def suffix_array(text):
+	n = len(text)
+	if n == 0:
+		return []
+	alphabet = list(set(text))
+	tim_sort(alphabet)
+	symbol_rank = {}
+	for i, symbol in enumerate(alphabet):
+		symbol_rank[symbol] = i + 1
+	rank = [symbol_rank[symbol] for symbol in text]
+	order = list(range(n))
+	type_counting_sort(order, alphabet, text.__getitem__)
+	max_rank = len(alphabet)
+	k = 1
+	# prefix doubling: order by the first 2k symbols using the ranks of the first k as radix digits
+	while max_rank < n:
+		# suffixes shorter than k have an empty second half and come first, the rest follow their second half
+		by_second = list(range(n - k, n))
+		for i in order:
+			if i >= k:
+				by_second.append(i - k)
+		order = _counting_sort_by_rank(by_second, rank, max_rank)
+		new_rank = [0 for i in range(n)]
+		new_rank[order[0]] = 1
+		for j in range(1, n):
+			a = order[j - 1]
+			b = order[j]
+			second_a = rank[a + k] if a + k < n else 0
+			second_b = rank[b + k] if b + k < n else 0
+			if rank[a] == rank[b] and second_a == second_b:
+				new_rank[b] = new_rank[a]
+			else:
+				new_rank[b] = new_rank[a] + 1
+		rank = new_rank
+		max_rank = rank[order[-1]]
+		k *= 2
+	return order
+
+
+def lcp_array(text, suffixes):
+	# Kasai's algorithm, lcp[i] is the longest common prefix of suffixes[i - 1] and suffixes[i]
+	n = len(text)
+	rank = [0 for i in range(n)]
+	for i, suffix in enumerate(suffixes):
+		rank[suffix] = i
+	lcp = [0 for i in range(n)]
+	h = 0
+	for i in range(n):
+		if rank[i] == 0:
+			h = 0
+			continue
+		j = suffixes[rank[i] - 1]
+		while i + h < n and j + h < n and text[i + h] == text[j + h]:
+			h += 1
+		lcp[rank[i]] = h
+		if h > 0:
+			h -= 1
+	return lcp
+
+
+class SuffixArray:
+
+	def __init__(self, text):
+		self._text = text
+		self._suffixes = suffix_array(text)
+		self._lcp = lcp_array(text, self._suffixes)
+
+	def suffixes(self):
+		return list(self._suffixes)
+
+	def lcp(self):
+		return list(self._lcp)
+
+	def find(self, pattern):
+		low, high = self._pattern_range(pattern)
+		return sorted(self._suffixes[low:high])
+
+	def count(self, pattern):
+		low, high = self._pattern_range(pattern)
+		return high - low
+
+	def longest_repeated_substring(self):
+		if len(self._text) < 2:
+			return self._text[:0]
+		best = 0
+		for i in range(1, len(self._lcp)):
+			if self._lcp[i] > self._lcp[best]:
+				best = i
+		start = self._suffixes[best]
+		return self._text[start:start + self._lcp[best]]
+
+	def __contains__(self, pattern):
+		return self.count(pattern) > 0
+
+	def __len__(self):
+		return len(self._text)
+
+	def _pattern_range(self, pattern):
+		m = len(pattern)
+		low = 0
+		high = len(self._suffixes)
+		while low < high:
+			mid = (low + high) // 2
+			start = self._suffixes[mid]
+			if self._text[start:start + m] < pattern:
+				low = mid + 1
+			else:
+				high = mid
+		first = low
+		high = len(self._suffixes)
+		while low < high:
+			mid = (low + high) // 2
+			start = self._suffixes[mid]
+			if pattern < self._text[start:start + m]:
+				high = mid
+			else:
+				low = mid + 1
+		return first, low
+
+
+class SuffixArrayTest(unittest.TestCase):
+
+	@staticmethod
+	def random_text(n, charset):
+		random.seed(n)
+		return "".join(charset[random.randint(0, len(charset) - 1)] for i in range(n))
+
+	def test_suffix_array(self):
+		for text in ("", "a", "banana", "aaaaaaaa", self.random_text(2000, "ab"), self.random_text(2000, "ACGT")):
+			suffixes = suffix_array(text)
+			self.assertEqual(sorted(range(len(text)), key = lambda i: text[i:]), suffixes)
+			lcp = lcp_array(text, suffixes)
+			for i in range(1, len(text)):
+				a = text[suffixes[i - 1]:]
+				b = text[suffixes[i]:]
+				common = 0
+				while common < min(len(a), len(b)) and a[common] == b[common]:
+					common += 1
+				self.assertEqual(common, lcp[i])
+
+	def test_sequences(self):
+		numbers = random_array(1000, 0, 5)
+		self.assertEqual(sorted(range(1000), key = lambda i: numbers[i:]), suffix_array(numbers))
+		data = bytes(numbers)
+		self.assertEqual(sorted(range(1000), key = lambda i: data[i:]), suffix_array(data))
+
+	def test_queries(self):
+		text = self.random_text(5000, "ACGT")
+		index = SuffixArray(text)
+		for pattern in ("A", "GATT", "ACGTA", "TTTTTTTTTTTTTTTTTT"):
+			expected = [i for i in range(len(text)) if text.startswith(pattern, i)]
+			self.assertEqual(expected, index.find(pattern))
+			self.assertEqual(len(expected), index.count(pattern))
+		self.assertEqual("ana", SuffixArray("banana").longest_repeated_substring())
+		self.assertEqual("", SuffixArray("").longest_repeated_substring())
+		repeated = index.longest_repeated_substring()
+		self.assertTrue(index.count(repeated) >= 2)
+		self.assertEqual(max(index.lcp()), len(repeated))
@@ -1,3 +1,4 @@
+import copy
 import random
 import string
 import unittest
@@ -6,16 +7,23 @@ from algorithms.sort import random_array
 
 
 class KeyNode:
+	# slots instead of a per instance __dict__, trees hold millions of these
+	__slots__ = ("key", "value")
 
 	def __init__(self, key, value):
 		self.key = key
 		self.value = value
 
 	def __repr__(self):
-		return repr(self.__dict__)
+		fields = {}
+		for cls in reversed(type(self).__mro__):
+			for name in getattr(cls, "__slots__", ()):
+				fields[name] = getattr(self, name)
+		return repr(fields)
 
 
 class BSTNode(KeyNode):
+	__slots__ = ("right", "left")
 
 	def __init__(self, key, value, left=None, right=None):
 		KeyNode.__init__(self, key, value)
@@ -24,6 +32,7 @@ class BSTNode(KeyNode):
 
 
 class RedBlackNode(BSTNode):
+	__slots__ = ("color",)
 
 	def __init__(self, key, value, left = None, right = None, color = False):
 		BSTNode.__init__(self, key, value, left, right)
@@ -112,7 +121,7 @@ class BinarySearchTree(BaseSymbolTable):
 
 	def copy(self):
 		new_root = self._copy_recursive(self._root)
-		result = BinarySearchTree()
+		result = type(self)()
 		result._root = new_root
 		result._size = self._size
 		result._use_pre = self._use_pre
@@ -254,7 +263,7 @@ class BinarySearchTree(BaseSymbolTable):
 	def _copy_recursive(self, root):
 		if root is None:
 			return None
-		new_root = KeyNode(root.key, root.value)
+		new_root = copy.copy(root)
 		new_root.left = self._copy_recursive(root.left)
 		new_root.right = self._copy_recursive(root.right)
 		return new_root
@@ -265,37 +274,169 @@ class RedBlackTree(BinarySearchTree):
 	def __init__(self):
 		BinarySearchTree.__init__(self)
 
+	def update(self, collection, **dictionary):
+		pairs = list(collection)
+		pairs.extend(dictionary.items())
+		if len(pairs) * self._size.bit_length() < self._size:
+			# a few pairs into a large tree are cheaper to insert one by one than to rebuild
+			for k, v in pairs:
+				self[k] = v
+			return
+		pairs.sort(key = lambda pair: pair[0])
+		merged = []
+		existing = self._sorted_nodes()
+		i = 0
+		for k, v in pairs:
+			while i < len(existing) and existing[i].key < k:
+				merged.append((existing[i].key, existing[i].value))
+				i += 1
+			if i < len(existing) and existing[i].key == k:
+				i += 1
+			if merged and merged[-1][0] == k:
+				# the sort is stable, so of several pairs with the same key the last one stays
+				merged[-1] = (k, v)
+			else:
+				merged.append((k, v))
+		for node in existing[i:]:
+			merged.append((node.key, node.value))
+		self._root = self._build(merged)
+		self._size = len(merged)
+
 	def __setitem__(self, key, value):
-		self._root = self._recursive_put(self._root, key, value)
-		self._root.color = False
+		path = []
+		node = self._root
+		while node is not None:
+			if key == node.key:
+				node.value = value
+				return
+			went_left = key < node.key
+			path.append((node, went_left))
+			node = node.left if went_left else node.right
+		self._size += 1
+		child = RedBlackNode(key, value, color = True)
+		while path:
+			node, went_left = path.pop()
+			color = node.color
+			if went_left:
+				node.left = child
+			else:
+				node.right = child
+			child = node
+			left = child.left
+			right = child.right
+			if right is not None and right.color and (left is None or not left.color):
+				child = self._rotate_left(child)
+			left = child.left
+			if left is not None and left.color and left.left is not None and left.left.color:
+				child = self._rotate_right(child)
+			left = child.left
+			right = child.right
+			if left is not None and left.color and right is not None and right.color:
+				self._flip_color(child)
+			if child is node and not color and not child.color:
+				# an unchanged black subtree root leaves every node above it as it was
+				return
+		self._root = child
+		child.color = False
 
 	def __delitem__(self, key):
-		if self._root is None:
-			return
-		if not self._is_red(self._root.left) and not self._is_red(self._root.right):
-			self._root.color = True
-		self._root = self._delete_recursive(self._root, key)
-		if self._root is not None:
-			self._root.color = False
-
-	def _recursive_put(self, root, key, value):
-		if root is None:
-			self._size += 1
-			return RedBlackNode(key, value, color = True)
-		if root.key == key:
-			root.value = value
-		else:
-			if key < root.key:
-				root.left = self._recursive_put(root.left, key, value)
+		if self._seek(key) is None:
+			raise KeyError(repr(key))
+		node = self._root
+		if not self._is_red(node.left) and not self._is_red(node.right):
+			node.color = True
+		# the descent moves a red link down ahead of itself so the removed node is never a lone black node,
+		# then the path is walked back up to restore the left leaning invariants
+		path = []
+		while True:
+			if key < node.key:
+				if not self._is_red(node.left) and not self._is_red(node.left.left):
+					node = self._move_red_left(node)
+				path.append((node, True))
+				node = node.left
+				continue
+			if self._is_red(node.left):
+				node = self._rotate_right(node)
+			if key == node.key and node.right is None:
+				break
+			if not self._is_red(node.right) and not self._is_red(node.right.left):
+				node = self._move_red_right(node)
+			if key == node.key:
+				# take the place of the successor and remove the successor from the right subtree instead
+				path.append((node, False))
+				successor = node.right
+				while successor.left is not None:
+					if not self._is_red(successor.left) and not self._is_red(successor.left.left):
+						successor = self._move_red_left(successor)
+					path.append((successor, True))
+					successor = successor.left
+				node.key = successor.key
+				node.value = successor.value
+				break
+			path.append((node, False))
+			node = node.right
+		self._size -= 1
+		child = None
+		while path:
+			node, went_left = path.pop()
+			if went_left:
+				node.left = child
 			else:
-				root.right = self._recursive_put(root.right, key, value)
-		if self._is_red(root.right) and not self._is_red(root.left):
-			root = self._rotate_left(root)
-		if self._is_red(root.left) and self._is_red(root.left.left):
-			root = self._rotate_right(root)
-		if self._is_red(root.left) and self._is_red(root.right):
-			self._flip_color(root)
-		return root
+				node.right = child
+			child = node
+			right = child.right
+			if right is not None and right.color:
+				child = self._rotate_left(child)
+			left = child.left
+			if left is not None and left.color and left.left is not None and left.left.color:
+				child = self._rotate_right(child)
+			left = child.left
+			right = child.right
+			if left is not None and left.color and right is not None and right.color:
+				self._flip_color(child)
+		self._root = child
+		if child is not None:
+			child.color = False
+
+	def _sorted_nodes(self):
+		nodes = []
+		stack = []
+		node = self._root
+		while stack or node is not None:
+			while node is not None:
+				stack.append(node)
+				node = node.left
+			node = stack.pop()
+			nodes.append(node)
+			node = node.right
+		return nodes
+
+	def _build(self, pairs):
+		if not pairs:
+			return None
+		height = (len(pairs) + 1).bit_length() - 1
+		return self._build_recursive(pairs, 0, len(pairs), height)
+
+	def _build_recursive(self, pairs, low, high, height):
+		# builds a 2-3 tree of the given black height, a 3-node is a black node with a red left child
+		count = high - low
+		if count == 0:
+			return None
+		most = 3 ** (height - 1) - 1
+		if count - 1 <= 2 * most:
+			middle = low + count // 2
+			node = RedBlackNode(pairs[middle][0], pairs[middle][1])
+			node.left = self._build_recursive(pairs, low, middle, height - 1)
+			node.right = self._build_recursive(pairs, middle + 1, high, height - 1)
+			return node
+		first = low + (count - 2) // 3
+		second = first + 1 + (count - 1) // 3
+		red = RedBlackNode(pairs[first][0], pairs[first][1], color = True)
+		red.left = self._build_recursive(pairs, low, first, height - 1)
+		red.right = self._build_recursive(pairs, first + 1, second, height - 1)
+		node = RedBlackNode(pairs[second][0], pairs[second][1], red)
+		node.right = self._build_recursive(pairs, second + 1, high, height - 1)
+		return node
 
 	def _is_red(self, node):
 		if node is None:
@@ -331,28 +472,6 @@ class RedBlackTree(BinarySearchTree):
 			self._flip_color(node)
 		return node
 
-	def _balance(self, node):
-		if self._is_red(node.right):
-			node = self._rotate_left(node)
-		if self._is_red(node.left) and self._is_red(node.left.left):
-			node = self._rotate_right(node)
-		if self._is_red(node.left) and self._is_red(node.right):
-			self._flip_color(node)
-		return node
-
-	def _delete_min_recursive(self, node):
-		if node.left is None:
-			return None
-		if not self._is_red(node.left) and not self._is_red(node.left.left):
-			node = self._move_red_left(node)
-		node.left = self._delete_min_recursive(node.left)
-		return self._balance(node)
-
-	def _min(self, root):
-		while root.left is not None:
-			root = root.left
-		return root
-
 	def _move_red_right(self, node):
 		self._flip_color(node)
 		if self._is_red(node.left.left):
@@ -360,29 +479,6 @@ class RedBlackTree(BinarySearchTree):
 			self._flip_color(node)
 		return node
 
-	def _delete_recursive(self, node, key):
-		if key < node.key:
-			if not self._is_red(node.left) and not self._is_red(node.left.left):
-				node = self._move_red_left(node)
-			node.left = self._delete_recursive(node.left, key)
-		else:
-			if self._is_red(node.left):
-				node = self._rotate_right(node)
-			if key == node.key and node.right is None:
-				self._size -= 1
-				return None
-			if not self._is_red(node.right) and not self._is_red(node.right.left):
-				node = self._move_red_right(node)
-			if key == node.key:
-				self._size -= 1
-				min_node = self._min(node.right)
-				node.key = min_node.key
-				node.value = min_node.value
-				node.right = self._delete_min_recursive(node.right)
-			else:
-				node.right = self._delete_recursive(node.right, key)
-		return self._balance(node)
-
 
 class SeparateChainingHashTable(BaseSymbolTable):
 
@@ -748,6 +844,95 @@ class RBTreeTest(DictionaryTest, unittest.TestCase):
 	def get_dictionary(self):
 		return RedBlackTree()
 
+	def check_invariants(self, tree):
+		self.assertFalse(tree._is_red(tree._root))
+		count = [0]
+
+		def black_height(node, low, high):
+			if node is None:
+				return 0
+			count[0] += 1
+			self.assertTrue(low is None or low < node.key)
+			self.assertTrue(high is None or node.key < high)
+			self.assertFalse(tree._is_red(node.right), "Red right link")
+			if node.color:
+				self.assertFalse(tree._is_red(node.left), "Two red links in a row")
+			left = black_height(node.left, low, node.key)
+			self.assertEqual(left, black_height(node.right, node.key, high), "Unbalanced black height")
+			return left + (0 if node.color else 1)
+
+		black_height(tree._root, None, None)
+		self.assertEqual(count[0], len(tree))
+
+	def test_invariants(self):
+		random.seed(8)
+		tree = RedBlackTree()
+		reference = {}
+		for i in range(3000):
+			key = random.randint(0, 500)
+			if key in reference and random.random() < 0.5:
+				del tree[key]
+				del reference[key]
+			else:
+				tree[key] = i
+				reference[key] = i
+			if i % 100 == 0:
+				self.check_invariants(tree)
+		self.check_invariants(tree)
+		self.assertEqual(sorted(reference.items()), list(tree.items()))
+		with self.assertRaises(KeyError):
+			del tree[-1]
+		for key in list(reference):
+			del tree[key]
+		self.assertEqual(0, len(tree))
+		with self.assertRaises(KeyError):
+			del tree[0]
+
+	def test_update(self):
+		random.seed(9)
+		for n in range(0, 130):
+			tree = RedBlackTree()
+			tree.update((k, -k) for k in random.sample(range(1000), n))
+			self.check_invariants(tree)
+			self.assertEqual(n, len(tree))
+		tree = RedBlackTree()
+		for k in range(0, 100, 2):
+			tree[k] = "old"
+		tree.update([(k, "new") for k in range(90, 150, 3)] + [(93, "last")])
+		self.check_invariants(tree)
+		expected = {k: "old" for k in range(0, 100, 2)}
+		expected.update((k, "new") for k in range(90, 150, 3))
+		expected[93] = "last"
+		self.assertEqual(sorted(expected.items()), list(tree.items()))
+		tree.update([(1, "one")])
+		self.check_invariants(tree)
+		self.assertEqual("one", tree[1])
+		words = RedBlackTree()
+		words.update([("b", 2), ("a", 0)], a = 1, c = 3)
+		self.assertEqual([("a", 1), ("b", 2), ("c", 3)], list(words.items()))
+
+
+class NodeTest(unittest.TestCase):
+
+	def test_slots(self):
+		for node in (KeyNode(1, "a"), BSTNode(1, "a"), RedBlackNode(1, "a", color = True)):
+			self.assertFalse(hasattr(node, "__dict__"))
+			with self.assertRaises(AttributeError):
+				node.extra = None
+		self.assertEqual(repr({"key": 1, "value": "a", "right": None, "left": None, "color": True}),
+		                 repr(RedBlackNode(1, "a", color = True)))
+
+	def test_copy(self):
+		for tree in (BinarySearchTree(), RedBlackTree()):
+			for i in random_array(100):
+				tree[i] = -i
+			duplicate = tree.copy()
+			self.assertIs(type(tree), type(duplicate))
+			self.assertEqual(list(tree.items()), list(duplicate.items()))
+			duplicate[-1] = 1
+			self.assertNotIn(-1, tree)
+			self.assertEqual(len(tree) + 1, len(duplicate))
+
 
 class SeparateChainingHashTableTest(DictionaryTest, unittest.TestCase):
 